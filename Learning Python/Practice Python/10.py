@@ -15,4 +15,5 @@ if __name__ == "__main__":
 
   print("a: " + str(a))
   print("b: " + str(b))
-  print("c: " + str([x for x in a if x in b]))
\ No newline at end of file
+  b_set = set(b)
+  print("c: " + str([x for x in a if x in b_set]))
\ No newline at end of file
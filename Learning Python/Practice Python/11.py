@@ -1,34 +1,352 @@
 # Check Primality Functions
 
+from array import array
+from collections import OrderedDict
+import math
+import mmap
+import os
+import random
+import struct
+import time
+
+EXTRA = 0
+
 SIEVE_SIZE = 100000
+MAX_SEGMENTS = 64
+
+SIEVE_MAGIC = b"SIEV"
+SIEVE_VERSION = 1
+SIEVE_HEADER = struct.Struct("<4sBc2xQ")
+
+# Deterministic for every x below 3.18 * 10^23, which covers all 64-bit values
+MILLER_RABIN_BASES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+def get_primes(limit):
+  composite = bytearray(limit + 1)
+  primes = []
+
+  for i in range(2, limit + 1):
+    if composite[i] == 0:
+      primes.append(i)
+      composite[i * i::i] = b'\x01' * len(range(i * i, limit + 1, i))
+
+  return primes
+
+def is_prime(x):
+  if x < 2:
+    return False
+
+  for base in MILLER_RABIN_BASES:
+    if x % base == 0:
+      return x == base
+
+  d, s = x - 1, 0
+  while d % 2 == 0:
+    d //= 2
+    s += 1
+
+  for base in MILLER_RABIN_BASES:
+    y = pow(base, d, x)
+    if y == 1 or y == x - 1:
+      continue
+
+    for i in range(s - 1):
+      y = y * y % x
+      if y == x - 1:
+        break
+    else:
+      return False
+
+  return True
+
+def pollard_brent(x):
+  if x % 2 == 0:
+    return 2
+
+  # Brent's cycle detection, batching the gcds over blocks of `m` steps
+  m = 128
+  for c in range(1, x):
+    y, r, q, g = 2, 1, 1, 1
+
+    while g == 1:
+      z = y
+      for i in range(r):
+        y = (y * y + c) % x
+
+      k = 0
+      while k < r and g == 1:
+        ys = y
+        for i in range(min(m, r - k)):
+          y = (y * y + c) % x
+          q = q * abs(z - y) % x
+
+        g = math.gcd(q, x)
+        k += m
+
+      r *= 2
+
+    # The batch overshot, so step back through it one gcd at a time
+    if g == x:
+      g = 1
+      while g == 1:
+        ys = (ys * ys + c) % x
+        g = math.gcd(abs(z - ys), x)
+
+    if g != x:
+      return g
+
+def trial_division(x):
+  factors = []
+
+  i = 2
+  while i * i <= x:
+    while x % i == 0:
+      x //= i
+      factors.append(i)
+    i += 1
+
+  if x != 1:
+    factors.append(x)
+
+  return factors
 
 class LinearSieve:
-  def __init__(self, size=SIEVE_SIZE):
-    self.sieve = [0] * size
+  def __init__(self, size=SIEVE_SIZE, segment_size=None, max_segments=MAX_SEGMENTS, cached=False):
+    if cached and segment_size != None:
+      raise ValueError("only an unsegmented sieve can be cached")
+
     self.size = size
+    self.segmented = segment_size != None
+    self.segment_size = segment_size if self.segmented else size
+    self.max_segments = max_segments
 
-    for i in range(2, size):
-      if self.sieve[i] == 0:
-        self.sieve[i] = i
-        for j in range(i * i, size, i):
-          if self.sieve[j] == 0:
-            self.sieve[j] = i
-  
-  def factorize(self, x):
+    # Primes are stored as 0, so only factors up to sqrt(size) ever need storing
+    self.typecode = 'H' if size <= 1 << 32 else 'L'
+    self.primes = get_primes(math.isqrt(max(size - 1, 0)))
+    self.segments = OrderedDict()
+
+    if not self.segmented:
+      if not cached or not self.load():
+        self.sieve = self.__build_segment(0)
+
+        # The cache only saves time, so a directory that cannot be written to is not an error
+        if cached:
+          try:
+            self.dump()
+          except OSError:
+            pass
+
+  def get_filename(self):
+    return f"sieve_{self.size}.bin"
+
+  def dump(self, filename=None):
+    if self.segmented:
+      raise ValueError("only an unsegmented sieve can be dumped")
+
+    if filename == None:
+      filename = self.get_filename()
+
+    # Written to the side first so that concurrent loaders never see a partial file
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    try:
+      with open(temporary, 'wb') as f:
+        f.write(SIEVE_HEADER.pack(SIEVE_MAGIC, SIEVE_VERSION, self.typecode.encode(), self.size))
+        f.write(self.sieve)
+      os.replace(temporary, filename)
+
+    # Whatever interrupted the write, a replaced file leaves nothing behind and a partial one is removed
+    finally:
+      if os.path.exists(temporary):
+        os.remove(temporary)
+
+  def load(self, filename=None):
+    if self.segmented:
+      raise ValueError("only an unsegmented sieve can be loaded")
+
+    if filename == None:
+      filename = self.get_filename()
+
+    try:
+      with open(filename, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+      return False
+
+    expected = SIEVE_HEADER.pack(SIEVE_MAGIC, SIEVE_VERSION, self.typecode.encode(), self.size)
+    itemsize = array(self.typecode).itemsize
+
+    if data[:SIEVE_HEADER.size] != expected or len(data) != len(expected) + self.size * itemsize:
+      data.close()
+      return False
+
+    # Reads go straight to the mapped pages, nothing is copied
+    self.mapping = data
+    self.sieve = memoryview(data)[SIEVE_HEADER.size:].cast(self.typecode)
+
+    return True
+
+  def __build_segment(self, index):
+    lower = index * self.segment_size
+    upper = min(lower + self.segment_size, self.size)
+    segment = array(self.typecode, [0]) * (upper - lower)
+
+    # Larger primes go first so that smaller ones overwrite them
+    for prime in reversed(self.primes):
+      start = max(prime * prime, (lower + prime - 1) // prime * prime)
+      if start >= upper:
+        continue
+
+      count = (upper - 1 - start) // prime + 1
+      segment[start - lower::prime] = array(self.typecode, [prime]) * count
+
+    return segment
+
+  def __get_segment(self, index):
+    if index in self.segments:
+      self.segments.move_to_end(index)
+      return self.segments[index]
+
+    segment = self.__build_segment(index)
+    self.segments[index] = segment
+    if len(self.segments) > self.max_segments:
+      self.segments.popitem(last=False)
+
+    return segment
+
+  def smallest_factor(self, x):
+    if not self.segmented:
+      return self.sieve[x] or x
+
+    if x < 0 or x >= self.size:
+      raise IndexError("sieve index out of range")
+
+    segment = self.__get_segment(x // self.segment_size)
+    return segment[x % self.segment_size] or x
+
+  def __factorize_unsegmented(self, x):
+    sieve = self.sieve
     factors = []
 
     while x != 1:
-      factor = self.sieve[x]
+      factor = sieve[x] or x
       factors.append(factor)
 
       x //= factor
-    
+
     return factors
 
+  def __factorize_large(self, x):
+    if x < self.size:
+      return self.factorize(x)
+
+    if is_prime(x):
+      return [x]
+
+    factor = pollard_brent(x)
+    return sorted(self.__factorize_large(factor) + self.__factorize_large(x // factor))
+
+  def factorize(self, x):
+    if x >= self.size:
+      return self.__factorize_large(x)
+
+    if not self.segmented:
+      return self.__factorize_unsegmented(x)
+
+    # Each cofactor would land in a different segment, so trial division by the primes up to sqrt(size) beats
+    # rebuilding segments one lookup at a time
+    factors = []
+
+    for prime in self.primes:
+      if prime * prime > x:
+        break
+
+      while x % prime == 0:
+        factors.append(prime)
+        x //= prime
+
+    if x != 1:
+      factors.append(x)
+
+    return factors
+
+  def factorize_array(self, xs):
+    import numpy as np
+
+    if self.segmented:
+      raise ValueError("only an unsegmented sieve can factorize arrays")
+
+    values = np.array(xs, dtype=np.int64).reshape(-1)
+    if values.size != 0 and (values.min() < 1 or values.max() >= self.size):
+      raise IndexError("sieve index out of range")
+
+    # A view over the table, mapped or not, and only the entries looked up are widened
+    sieve = np.frombuffer(self.sieve, dtype=f"u{array(self.typecode).itemsize}")
+
+    # Every round takes one step through the table for each query still above 1, then drops the finished ones,
+    # so the work is the total number of factors rather than a Python call per query
+    count = len(values)
+    index = np.flatnonzero(values > 1)
+    values = values[index]
+
+    indices, factors = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    while len(values) != 0:
+      step = sieve[values].astype(np.int64)
+      step = np.where(step == 0, values, step)
+      indices.append(index)
+      factors.append(step)
+
+      values //= step
+      remaining = values > 1
+      index, values = index[remaining], values[remaining]
+
+    # Grouped by query, and a stable sort keeps each query's factors in the order they were found
+    indices, factors = np.concatenate(indices), np.concatenate(factors)
+    order = np.argsort(indices, kind="stable")
+
+    # The factors of `xs[i]` are `factors[offsets[i]:offsets[i + 1]]`
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=count), out=offsets[1:])
+
+    return factors[order], offsets
+
+  def factorize_many(self, xs):
+    xs = list(xs)
+
+    if not self.segmented:
+      return [self.__factorize_unsegmented(x) if 0 < x < self.size else self.factorize(x) for x in xs]
+
+    return [self.factorize(x) for x in xs]
+
 if __name__ == "__main__":
-  linear_sieve = LinearSieve()
+  if EXTRA == 0:
+    linear_sieve = LinearSieve()
+
+    dividend = int(input("Dividend: "))
+
+    print(linear_sieve.factorize(dividend))
+
+  elif EXTRA == 1:
+    linear_sieve = LinearSieve()
+
+    for exponent in range(4, 19, 2):
+      dividends = [random.randint(10 ** (exponent - 1), 10 ** exponent) for i in range(100)]
+
+      start = time.perf_counter()
+      for dividend in dividends:
+        linear_sieve.factorize(dividend)
+      hybrid_time = time.perf_counter() - start
+
+      # Trial division is O(sqrt(x)) per call, so stop timing it once it takes too long
+      trial_division_time = None
+      if exponent <= 12:
+        start = time.perf_counter()
+        for dividend in dividends:
+          trial_division(dividend)
+        trial_division_time = time.perf_counter() - start
+
+      print(f"10^{exponent}: hybrid {hybrid_time:.4f}s, ", end="")
+      if trial_division_time == None:
+        print("trial division skipped")
+      else:
+        print(f"trial division {trial_division_time:.4f}s")
 
-  dividend = int(input(f"Dividend, in range [1, {linear_sieve.size}): "))
-  
-  print(linear_sieve.factorize(dividend))
-  
\ No newline at end of file
@@ -1,5 +1,12 @@
 # Fibonacci
 
+from functools import lru_cache
+import itertools
+
+EXTRA = 0
+
+FIBONACCI_CACHE_SIZE = 128
+
 def fibonacci(n):
   numbers = []
 
@@ -7,10 +14,60 @@ def fibonacci(n):
   for i in range(n):
     numbers.append(a)
     a, b = b, a + b
-  
+
   return numbers
 
+def fibonacci_pair(n, mod=None):
+  a, b = 0, 1
+
+  # Fast doubling over the bits of n, from the most significant down
+  for bit in bin(n)[2:]:
+    c = a * (2 * b - a)
+    d = a * a + b * b
+
+    if bit == '1':
+      a, b = d, c + d
+    else:
+      a, b = c, d
+
+    if mod != None:
+      a, b = a % mod, b % mod
+
+  return a, b
+
+@lru_cache(maxsize=FIBONACCI_CACHE_SIZE)
+def fibonacci_nth(n, mod=None):
+  return fibonacci_pair(n, mod)[0]
+
+def fibonacci_iter(start=1, stop=None, mod=None):
+  a, b = fibonacci_pair(start, mod)
+
+  for i in itertools.count(start) if stop == None else range(start, stop):
+    yield a
+
+    a, b = b, a + b
+    if mod != None:
+      b %= mod
+
 if __name__ == "__main__":
-  n = int(input("Fibonacci count: "))
+  if EXTRA == 0:
+    n = int(input("Fibonacci count: "))
+
+    print(fibonacci(n))
+
+  elif EXTRA == 1:
+    n = int(input("Fibonacci index: "))
+
+    print(fibonacci_nth(n))
+
+  elif EXTRA == 2:
+    n = int(input("Fibonacci index: "))
+    mod = int(input("Modulus: "))
+
+    print(fibonacci_nth(n, mod))
+
+  elif EXTRA == 3:
+    start = int(input("Fibonacci start index: "))
+    count = int(input("Fibonacci count: "))
 
-  print(fibonacci(n))
\ No newline at end of file
+    print(list(fibonacci_iter(start, start + count)))
@@ -1,14 +1,48 @@
 # List Remove Duplicates
 
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Sequence
+import itertools
+import math
 import random
 
 EXTRA = 0
 
+class BloomFilter:
+  def __init__(self, capacity, error_rate=0.001):
+    self.size = max(1, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    self.hash_count = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+    self.bits = bytearray((self.size + 7) // 8)
+
+  def __get_positions(self, x):
+    # Double hashing: k positions from two independent hashes
+    a = hash(x)
+    b = hash((x, self.size)) | 1
+
+    return [(a + i * b) % self.size for i in range(self.hash_count)]
+
+  def add(self, x):
+    added = False
+
+    for position in self.__get_positions(x):
+      byte, bit = position >> 3, 1 << (position & 7)
+      if self.bits[byte] & bit == 0:
+        self.bits[byte] |= bit
+        added = True
+
+    return added
+
+  def __contains__(self, x):
+    return all(self.bits[position >> 3] & 1 << (position & 7) for position in self.__get_positions(x))
+
 def loop_unique(input_list):
   result = []
+  seen = set()
 
   for x in input_list:
-    if x not in result:
+    if x not in seen:
+      seen.add(x)
       result.append(x)
 
   return result
@@ -16,11 +50,120 @@ def loop_unique(input_list):
 def set_unique(input_list):
   return list(set(input_list))
 
+def stream_unique(iterable, key=None, capacity=None, error_rate=0.001):
+  # With a capacity, memory is bounded by a Bloom filter, at the cost of
+  # occasionally dropping a value that was never actually seen
+  seen = set() if capacity == None else BloomFilter(capacity, error_rate)
+
+  for x in iterable:
+    k = x if key == None else key(x)
+
+    if capacity == None:
+      if k in seen:
+        continue
+      seen.add(k)
+
+    elif not seen.add(k):
+      continue
+
+    yield x
+
 def exercise_5_random_list():
   return [random.randint(1, 100) for i in range(random.randint(10, 20))]
 
 def exercise_5_list_overlap(a, b):
-  return list(set(a).intersection(set(b)))
+  return list(intersect(a, b))
+
+def is_sorted(x):
+  return all(a <= b for a, b in zip(x, itertools.islice(x, 1, None)))
+
+def gallop(haystack, needle, lo):
+  hi, step = lo, 1
+  while hi < len(haystack) and haystack[hi] < needle:
+    lo = hi + 1
+    hi += step
+    step *= 2
+
+  return bisect_left(haystack, needle, lo, min(hi, len(haystack)))
+
+def sorted_intersection(stream, haystack):
+  i = 0
+
+  # Exponential search only pays for the gaps it skips, so skewed sizes stay cheap
+  for x in stream:
+    i = gallop(haystack, x, i)
+    if i == len(haystack):
+      return
+
+    if haystack[i] == x:
+      yield x
+      i += 1
+
+def hash_intersection(stream, others, multiset):
+  if multiset:
+    counts = [Counter(other) for other in others]
+
+    for x in stream:
+      if all(count[x] > 0 for count in counts):
+        for count in counts:
+          count[x] -= 1
+        yield x
+
+  else:
+    members = [set(other) for other in others]
+    members.sort(key=len)
+    seen = set()
+
+    for x in stream:
+      if x not in seen and all(x in member for member in members):
+        seen.add(x)
+        yield x
+
+def numpy_unique(array):
+  import numpy as np
+
+  # A plain sort and a scan for boundaries, since `np.unique` is far slower than `np.sort` on large integer arrays
+  values = np.sort(array, axis=None)
+  starts = np.flatnonzero(np.concatenate(([len(values) != 0], values[1:] != values[:-1])))
+
+  return values[starts], np.diff(np.append(starts, len(values)))
+
+def numpy_intersection(arrays, multiset):
+  import numpy as np
+
+  values, counts = numpy_unique(arrays[0])
+  for other in arrays[1:]:
+    other_values, other_counts = numpy_unique(other)
+
+    positions = np.searchsorted(other_values, values)
+    found = positions < len(other_values)
+    found[found] = other_values[positions[found]] == values[found]
+
+    values = values[found]
+    counts = np.minimum(counts[found], other_counts[positions[found]])
+
+  # Under multiset semantics each value is kept as many times as the array with the fewest copies holds it
+  return np.repeat(values, counts) if multiset else values
+
+def intersect(*iterables, multiset=False):
+  # Numeric arrays are intersected whole by NumPy, which is only imported when such arrays are passed in
+  if len(iterables) != 0 and all(hasattr(x, "dtype") and x.dtype.kind in "iuf" for x in iterables):
+    return iter(numpy_intersection(iterables, multiset).tolist())
+
+  lists = [x if isinstance(x, Sequence) else list(x) for x in iterables]
+  if len(lists) == 0:
+    return iter([])
+
+  lists.sort(key=len)
+
+  if all(is_sorted(x) for x in lists):
+    stream = iter(lists[0]) if multiset else (x for x, group in itertools.groupby(lists[0]))
+    for other in lists[1:]:
+      stream = sorted_intersection(stream, other)
+    return stream
+
+  # Stream the largest list and only hash the smaller ones
+  return hash_intersection(iter(lists[-1]), lists[:-1], multiset)
 
 if __name__ == "__main__":
   if EXTRA == 0:
@@ -33,6 +176,7 @@ if __name__ == "__main__":
 
     print("loop_unique: " + str(loop_unique(names)))
     print("set_unique: " + str(set_unique(names)))
+    print("stream_unique: " + str(list(stream_unique(names, key=str.lower))))
 
   elif EXTRA == 2:
     a = exercise_5_random_list()
@@ -41,4 +185,15 @@ if __name__ == "__main__":
 
     print("a: " + str(a))
     print("b: " + str(b))
-    print("c: " + str(c))
\ No newline at end of file
+    print("c: " + str(c))
+
+  elif EXTRA == 3:
+    a = sorted(exercise_5_random_list())
+    b = sorted(exercise_5_random_list())
+    c = exercise_5_random_list()
+
+    print("a: " + str(a))
+    print("b: " + str(b))
+    print("c: " + str(c))
+    print("a & b: " + str(list(intersect(a, b))))
+    print("a & b & c: " + str(list(intersect(a, b, c, multiset=True))))
\ No newline at end of file
@@ -1,32 +1,114 @@
 # Password Generator
 
+from functools import lru_cache
+import os
 import random
+import string
+import time
 
-domain = ""
-def domain_add_range(lower, upper):
-  global domain
+EXTRA = 0
 
-  for i in range(ord(lower), ord(upper) + 1):
-    domain += chr(i)
+BATCH_SIZE = 10000
 
-domain_add_range('a', 'z')
-domain_add_range('A', 'Z')
-domain_add_range('0', '9')
-domain += "~!@#$%^&*()_+`-={}|[]\\;':\",./<>?"
+SYMBOLS = "~!@#$%^&*()_+`-={}|[]\\;':\",./<>?"
+CLASSES = [string.ascii_lowercase, string.ascii_uppercase, string.digits, SYMBOLS]
 
-def generate_password(length):
-  password = ""
+domain = "".join(CLASSES)
+
+@lru_cache
+def get_translation(alphabet):
+  # Bytes past the last whole multiple of the alphabet size are rejected,
+  # so that every character stays equally likely
+  limit = 256 - 256 % len(alphabet)
+  table = bytes(ord(alphabet[i % len(alphabet)]) if i < limit else 0 for i in range(256))
+  rejected = bytes(range(limit, 256))
+
+  return limit, table, rejected
+
+def random_bytes(alphabet, count):
+  limit, table, rejected = get_translation(alphabet)
+
+  chunks, remaining = [], count
+  while remaining > 0:
+    chunk = os.urandom(remaining * 256 // limit + 16).translate(table, rejected)
+    chunks.append(chunk)
+    remaining -= len(chunk)
+
+  return b"".join(chunks)[:count]
+
+def random_characters(alphabet, count):
+  return random_bytes(alphabet, count).decode("ascii")
+
+def random_swaps(length, count):
+  # For a Fisher-Yates shuffle, position `j` of every password swaps with a uniform index in [0, j],
+  # and each of those columns is drawn in bulk like the characters are
+  return [random_bytes("".join(map(chr, range(j + 1))), count) for j in range(length)]
+
+def generate_passwords(count, length, min_lower=0, min_upper=0, min_digits=0, min_symbols=0):
+  minimums = [min_lower, min_upper, min_digits, min_symbols]
+  free = length - sum(minimums)
+
+  if free < 0:
+    raise ValueError("password length is shorter than the policy minimums")
+
+  characters = random_characters(domain, count * free)
+  if free == length:
+    return [characters[i * length:(i + 1) * length] for i in range(count)]
+
+  # Required characters are drawn from their own class and shuffled in, so no password is ever thrown away
+  pools = [random_characters(alphabet, count * minimum) for alphabet, minimum in zip(CLASSES, minimums)]
 
-  for i in range(length):
-    password += domain[random.randint(0, len(domain) - 1)]
-  
-  return password
+  # A byte can only pick among 256 positions, so longer passwords fall back to shuffling one at a time
+  swaps = random_swaps(length, count) if length <= 256 else None
+  shuffler = random.SystemRandom()
+
+  passwords = []
+  for i in range(count):
+    password = list(characters[i * free:(i + 1) * free])
+    for pool, minimum in zip(pools, minimums):
+      password.extend(pool[i * minimum:(i + 1) * minimum])
+
+    if swaps == None:
+      shuffler.shuffle(password)
+    else:
+      for j in range(length - 1, 0, -1):
+        k = swaps[j][i]
+        password[j], password[k] = password[k], password[j]
+
+    passwords.append("".join(password))
+
+  return passwords
+
+def write_passwords(filename, count, length, batch_size=BATCH_SIZE, **policy):
+  with open(filename, 'w') as f:
+    for start in range(0, count, batch_size):
+      passwords = generate_passwords(min(batch_size, count - start), length, **policy)
+      f.write("\n".join(passwords) + "\n")
+
+def generate_password(length):
+  return generate_passwords(1, length)[0]
 
 if __name__ == "__main__":
-  while True:
-    length = input("Length (or `exit` to exit): ").lower()
+  if EXTRA == 0:
+    while True:
+      length = input("Length (or `exit` to exit): ").lower()
+
+      if length == "exit":
+        break
+
+      print(generate_password(int(length)))
+
+  elif EXTRA == 1:
+    count = 100000
+
+    for policy in [{}, {"min_lower": 1, "min_upper": 1, "min_digits": 1, "min_symbols": 1}]:
+      start = time.perf_counter()
+      for i in range(count // 10):
+        generate_passwords(1, 16, **policy)
+      single = count // 10 / (time.perf_counter() - start)
+
+      start = time.perf_counter()
+      generate_passwords(count, 16, **policy)
+      bulk = count / (time.perf_counter() - start)
 
-    if length == "exit":
-      break
-      
-    print(generate_password(int(length)))
\ No newline at end of file
+      print(f"Policy {policy}: one at a time {single:.0f} passwords/s, bulk {bulk:.0f} passwords/s")
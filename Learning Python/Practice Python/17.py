@@ -1,15 +1,176 @@
 # Decode A Web Page
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import http.server
+import threading
+import time
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from html_extract import extract_stream
+
+EXTRA = 0
+
+CONCURRENCY = 16
+HOST_INTERVAL = 0.05
+RETRIES = 3
+BACKOFF = 0.5
+TIMEOUT = 10
+CHUNK_SIZE = 1 << 16
+
+def extract_h3(html):
+  soup = BeautifulSoup(html, "html.parser")
+
+  return [x.string for x in soup.find_all("h3")]
+
+def extract_paywall(html):
+  soup = BeautifulSoup(html, "html.parser")
+
+  return [x.string for x in soup.find_all("p", {"class": "paywall"}) if x.string != None]
+
+class HostRateLimiter:
+  def __init__(self, interval):
+    self.interval = interval
+    self.next_times = {}
+
+  async def wait(self, host):
+    now = asyncio.get_running_loop().time()
+
+    # Each caller reserves the next free slot for its host before sleeping
+    slot = max(now, self.next_times.get(host, now))
+    self.next_times[host] = slot + self.interval
+
+    await asyncio.sleep(slot - now)
+
+class Scraper:
+  def __init__(self, concurrency=CONCURRENCY, host_interval=HOST_INTERVAL, retries=RETRIES, timeout=TIMEOUT):
+    self.concurrency = concurrency
+    self.retries = retries
+    self.timeout = timeout
+    self.limiter = HostRateLimiter(host_interval)
+
+    # One pooled connection per worker thread, reused across requests to the same host
+    self.session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    self.session.mount("http://", adapter)
+    self.session.mount("https://", adapter)
+
+  def __get(self, url):
+    response = self.session.get(url, timeout=self.timeout)
+    response.raise_for_status()
+
+    return response.text
+
+  async def fetch(self, url, fetch_pool):
+    loop = asyncio.get_running_loop()
+    host = urlsplit(url).netloc
+
+    for attempt in range(self.retries + 1):
+      await self.limiter.wait(host)
+
+      try:
+        return await loop.run_in_executor(fetch_pool, self.__get, url)
+
+      except requests.HTTPError as error:
+        if error.response.status_code < 500 or attempt == self.retries:
+          return None
+
+      except requests.RequestException:
+        if attempt == self.retries:
+          return None
+
+      await asyncio.sleep(BACKOFF * 2 ** attempt)
+
+  async def scrape(self, urls, extract):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(self.concurrency)
+
+    with ThreadPoolExecutor(self.concurrency) as fetch_pool, ProcessPoolExecutor() as parse_pool:
+      async def process(url):
+        async with semaphore:
+          html = await self.fetch(url, fetch_pool)
+
+        if html == None:
+          return url, None
+
+        return url, await loop.run_in_executor(parse_pool, extract, html)
+
+      for result in asyncio.as_completed([process(url) for url in urls]):
+        yield await result
+
+  def close(self):
+    self.session.close()
+
+def scrape(urls, extract, **options):
+  async def collect():
+    return [result async for result in scraper.scrape(urls, extract)]
+
+  scraper = Scraper(**options)
+  try:
+    return asyncio.run(collect())
+  finally:
+    scraper.close()
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+  def do_GET(self):
+    body = f"<html><body><h3>{self.path}</h3><p class=\"paywall\">{self.path}</p></body></html>".encode()
+
+    self.send_response(200)
+    self.send_header("Content-Type", "text/html")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+def start_stand_in_server():
+  server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+
+  return server
+
 if __name__ == "__main__":
-  url = "https://www.nytimes.com/"
-  html = requests.get(url).text
+  if EXTRA == 0:
+    url = "https://www.nytimes.com/"
+    html = requests.get(url).text
+
+    soup = BeautifulSoup(html)
+
+    h3_list = soup.find_all("h3")
+    h3_string_list = list(map(lambda x: x.string, h3_list))
+
+    print(h3_string_list)
+
+  elif EXTRA == 1:
+    urls = ["https://www.nytimes.com/"]
+
+    for url, h3_string_list in scrape(urls, extract_h3):
+      print(url)
+      print(h3_string_list)
+
+  elif EXTRA == 2:
+    server = start_stand_in_server()
+    host, port = server.server_address
+    urls = [f"http://{host}:{port}/{i}" for i in range(1000)]
+
+    start = time.perf_counter()
+    results = scrape(urls, extract_h3, host_interval=0)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scraped {len(results)} pages in {elapsed:.2f}s")
+    server.shutdown()
 
-  soup = BeautifulSoup(html)
+  elif EXTRA == 3:
+    url = "https://www.nytimes.com/"
 
-  h3_list = soup.find_all("h3")
-  h3_string_list = list(map(lambda x: x.string, h3_list))
+    # Headings are picked out as the page downloads, without building a tree of the whole page
+    with requests.get(url, stream=True) as response:
+      chunks = response.iter_content(CHUNK_SIZE, decode_unicode=True)
+      h3_string_list = list(extract_stream(chunks, "h3"))
 
-  print(h3_string_list)
\ No newline at end of file
+    print(h3_string_list)
\ No newline at end of file
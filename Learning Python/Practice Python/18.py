@@ -1,10 +1,177 @@
 # Cows And Bulls
 
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import mmap
+import os
 import random
 import re
+import struct
+import time
+
+EXTRA = 0
+
+CODE_COUNT = 10000
+WIN_FEEDBACK = 4 * 5
+WORK_LIMIT = 100000
+
+# Every other opening is one of these with its digits or positions relabelled
+FIRST_GUESSES = [0, 1, 11, 12, 123]
+
+TABLE_FILENAME = "18.feedback"
+TABLE_MAGIC = b"CBFB"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<4sB3xI")
 
 guess_pattern = re.compile("[0-9]{4}")
 
+def to_code_string(code):
+  return f"{code:04d}"
+
+@lru_cache
+def get_code_tables():
+  digits = [tuple(int(x) for x in to_code_string(code)) for code in range(CODE_COUNT)]
+
+  # For every code and every set of matching positions, the digits left over as a 10-bit mask
+  remaining = []
+  for code_digits in digits:
+    masks = []
+    for matches in range(16):
+      mask = 0
+      for i in range(4):
+        if matches >> i & 1 == 0:
+          mask |= 1 << code_digits[i]
+      masks.append(mask)
+    remaining.append(masks)
+
+  popcounts = [bin(i).count('1') for i in range(1024)]
+
+  return digits, remaining, popcounts
+
+def get_feedback_row(guess):
+  digits, remaining, popcounts = get_code_tables()
+  g0, g1, g2, g3 = digits[guess]
+  guess_remaining = remaining[guess]
+
+  # Feedback is packed as cows * 5 + bulls, with the same rules as `CowsAndBulls`
+  row = bytearray(CODE_COUNT)
+  for code, (c0, c1, c2, c3) in enumerate(digits):
+    matches = (c0 == g0) | (c1 == g1) << 1 | (c2 == g2) << 2 | (c3 == g3) << 3
+    row[code] = popcounts[matches] * 5 + popcounts[guess_remaining[matches] & remaining[code][matches]]
+
+  return row
+
+class FeedbackTable:
+  def __init__(self, filename=TABLE_FILENAME, workers=None):
+    self.filename = filename
+
+    if not self.load():
+      self.table = memoryview(self.__build(workers))
+      self.dump()
+
+  def __build(self, workers):
+    table = bytearray()
+
+    with ProcessPoolExecutor(workers) as executor:
+      for row in executor.map(get_feedback_row, range(CODE_COUNT), chunksize=100):
+        table += row
+
+    return table
+
+  def dump(self):
+    temporary = f"{self.filename}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+      f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, CODE_COUNT))
+      f.write(self.table)
+    os.replace(temporary, self.filename)
+
+  def load(self):
+    try:
+      with open(self.filename, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+      return False
+
+    header = TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, CODE_COUNT)
+    if data[:len(header)] != header or len(data) != len(header) + CODE_COUNT * CODE_COUNT:
+      data.close()
+      return False
+
+    self.table = memoryview(data)[len(header):]
+    return True
+
+  def get_row(self, guess):
+    return self.table[guess * CODE_COUNT:(guess + 1) * CODE_COUNT]
+
+class CowsAndBullsSolver:
+  MINIMAX = 0
+  EXPECTED_SIZE = 1
+
+  def __init__(self, table, strategy=MINIMAX, work_limit=WORK_LIMIT):
+    self.table = table
+    self.strategy = strategy
+    self.work_limit = work_limit
+    self.candidates = list(range(CODE_COUNT))
+
+  def __get_score(self, guess, candidates, candidate_set):
+    row = self.table.get_row(guess)
+    sizes = Counter(map(row.__getitem__, candidates)).values()
+
+    if self.strategy == CowsAndBullsSolver.MINIMAX:
+      score = max(sizes)
+    else:
+      score = sum(size * size for size in sizes)
+
+    # On ties, a guess that could be the answer is better
+    return score, guess not in candidate_set
+
+  def choose(self, candidates):
+    if len(candidates) <= 2:
+      return candidates[0]
+
+    if len(candidates) == CODE_COUNT:
+      guesses = FIRST_GUESSES
+
+    elif len(candidates) * CODE_COUNT <= self.work_limit:
+      guesses = range(CODE_COUNT)
+
+    else:
+      # Too many to try every code, so try an even spread of the candidates
+      step = -(-len(candidates) * len(candidates) // self.work_limit)
+      guesses = candidates[::step]
+
+    candidate_set = set(candidates)
+    return min(guesses, key=lambda guess: self.__get_score(guess, candidates, candidate_set))
+
+  def guess(self):
+    return to_code_string(self.choose(self.candidates))
+
+  def update(self, guess, cows, bulls):
+    row = self.table.get_row(int(guess))
+    feedback = cows * 5 + bulls
+
+    self.candidates = [code for code in self.candidates if row[code] == feedback]
+
+  def play_all(self, candidates=None, depth=1, counts=None):
+    if candidates == None:
+      candidates, counts = list(range(CODE_COUNT)), Counter()
+
+    guess = self.choose(candidates)
+    row = self.table.get_row(guess)
+
+    partitions = {}
+    for code in candidates:
+      partitions.setdefault(row[code], []).append(code)
+
+    for feedback, partition in partitions.items():
+      if feedback == WIN_FEEDBACK:
+        counts[depth] += 1
+      else:
+        self.play_all(partition, depth + 1, counts)
+
+    return counts
+
 class CowsAndBulls:
   def __init__(self):
     self.target = ""
@@ -33,37 +200,65 @@ class CowsAndBulls:
     return len(guess_remaining.intersection(target_remaining))
 
 if __name__ == "__main__":
-  playing = True
-  while playing:
-    cows_and_bulls = CowsAndBulls()
+  if EXTRA == 0:
+    playing = True
+    while playing:
+      cows_and_bulls = CowsAndBulls()
 
-    guessing = True
-    while guessing:
-      guess = input("Guess (or `exit` to exit): ").strip().lower()
+      guessing = True
+      while guessing:
+        guess = input("Guess (or `exit` to exit): ").strip().lower()
 
-      if guess == "exit":
-        guessing = False
-        break
+        if guess == "exit":
+          guessing = False
+          break
       
-      if len(guess) != 4 or guess_pattern.search(guess) == None:
-        continue
+        if len(guess) != 4 or guess_pattern.search(guess) == None:
+          continue
 
+        cows = cows_and_bulls.count_cows(guess)
+        bulls = cows_and_bulls.count_bulls(guess)
+
+        print("Cows: ", cows)
+        print("Bulls: ", bulls)
+
+        if cows == 4:
+          break
+    
+      deciding = True
+      while deciding:
+        decision = input("Play again (Y/n): ").strip().lower()
+
+        if decision == 'y':
+          deciding = False
+      
+        elif decision == 'n':
+          deciding = False
+          playing = False
+
+  elif EXTRA == 1:
+    cows_and_bulls = CowsAndBulls()
+    solver = CowsAndBullsSolver(FeedbackTable())
+
+    while True:
+      guess = solver.guess()
       cows = cows_and_bulls.count_cows(guess)
       bulls = cows_and_bulls.count_bulls(guess)
 
-      print("Cows: ", cows)
-      print("Bulls: ", bulls)
+      print(f"Guess: {guess}, cows: {cows}, bulls: {bulls}")
 
       if cows == 4:
         break
-    
-    deciding = True
-    while deciding:
-      decision = input("Play again (Y/n): ").strip().lower()
 
-      if decision == 'y':
-        deciding = False
-      
-      elif decision == 'n':
-        deciding = False
-        playing = False
\ No newline at end of file
+      solver.update(guess, cows, bulls)
+
+  elif EXTRA == 2:
+    table = FeedbackTable()
+
+    for name, strategy in [("Minimax", CowsAndBullsSolver.MINIMAX), ("Expected size", CowsAndBullsSolver.EXPECTED_SIZE)]:
+      start = time.perf_counter()
+      counts = CowsAndBullsSolver(table, strategy).play_all()
+      elapsed = time.perf_counter() - start
+
+      average = sum(depth * count for depth, count in counts.items()) / CODE_COUNT
+      print(f"{name}: average {average:.3f} guesses, worst {max(counts)} guesses, {elapsed:.1f}s")
@@ -1,16 +1,76 @@
 # Decode A Web Page Two
 
 from bs4 import BeautifulSoup
+import os
 import requests
+import tempfile
+import time
+import tracemalloc
+
+from html_extract import extract_stream
+
+EXTRA = 0
+
+CHUNK_SIZE = 1 << 16
+
+def read_chunks(filename):
+  with open(filename, 'r') as f:
+    while chunk:=f.read(CHUNK_SIZE):
+      yield chunk
+
+def write_fixture(filename, paragraphs):
+  with open(filename, 'w') as f:
+    f.write("<html><body>")
+    for i in range(paragraphs):
+      f.write(f"<div><h3>Heading {i}</h3><p>Filler {i} <a href=\"#\">link</a></p>")
+      f.write(f"<p class=\"paywall\">Paragraph {i}</p></div>")
+    f.write("</body></html>")
 
 if __name__ == "__main__":
   url = "http://www.vanityfair.com/society/2014/06/monica-lewinsky-humiliation-culture"
-  html = requests.get(url).text
 
-  soup = BeautifulSoup(html)
+  if EXTRA == 0:
+    html = requests.get(url).text
+
+    soup = BeautifulSoup(html)
+
+    p_list = soup.find_all("p", {"class": "paywall"})
+    p_string_list = list(filter(lambda x: x != None, map(lambda x: x.string, p_list)))
+    p_string = "\n".join(p_string_list)
+
+    print(p_string)
+
+  elif EXTRA == 1:
+    with requests.get(url, stream=True) as response:
+      chunks = response.iter_content(CHUNK_SIZE, decode_unicode=True)
+      p_string_list = filter(lambda x: x != None, extract_stream(chunks, "p", {"class": "paywall"}))
+
+      for p_string in p_string_list:
+        print(p_string)
+
+  elif EXTRA == 2:
+    with tempfile.TemporaryDirectory() as directory:
+      for paragraphs in [1000, 10000, 30000]:
+        filename = os.path.join(directory, f"{paragraphs}.html")
+        write_fixture(filename, paragraphs)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(filename, 'r') as f:
+          soup = BeautifulSoup(f.read(), "html.parser")
+        full = [x.string for x in soup.find_all("p", {"class": "paywall"})]
+        del soup
+        full_time = time.perf_counter() - start
+        full_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
 
-  p_list = soup.find_all("p", {"class": "paywall"})
-  p_string_list = list(filter(lambda x: x != None, map(lambda x: x.string, p_list)))
-  p_string = "\n".join(p_string_list)
+        tracemalloc.start()
+        start = time.perf_counter()
+        streamed = sum(1 for x in extract_stream(read_chunks(filename), "p", {"class": "paywall"}))
+        streamed_time = time.perf_counter() - start
+        streamed_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
 
-  print(p_string)
\ No newline at end of file
+        print(f"{os.path.getsize(filename) / 1e6:.1f} MB: ", end="")
+        print(f"full tree {full_time:.2f}s / {full_peak / 1e6:.1f} MB peak, ", end="")
+        print(f"streaming {streamed_time:.2f}s / {streamed_peak / 1e6:.1f} MB peak ({len(full)} = {streamed})")
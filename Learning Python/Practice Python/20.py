@@ -1,5 +1,7 @@
 # Element Search
 
+from bisect import bisect_left, bisect_right
+import itertools
 import random
 
 EXTRA = 1
@@ -24,6 +26,100 @@ def binary_search(haystack, needle):
       return True
   return False
 
+def gallop(haystack, needle, lo, right=False):
+  search = bisect_right if right else bisect_left
+
+  hi, step = lo, 1
+  while hi < len(haystack) and (haystack[hi] <= needle if right else haystack[hi] < needle):
+    lo = hi + 1
+    hi += step
+    step *= 2
+
+  return search(haystack, needle, lo, min(hi, len(haystack)))
+
+def numpy_batch_search(haystack, needles, right=False):
+  try:
+    import numpy as np
+  except ImportError:
+    return None
+
+  # Copying a list haystack into an array is only worth it when the batch is big enough to pay for it
+  if not isinstance(haystack, np.ndarray) and len(needles) * 8 < len(haystack):
+    return None
+
+  keys, queries = np.asarray(haystack), np.asarray(needles)
+  if keys.dtype.kind not in "iuf" or queries.dtype.kind not in "iuf":
+    return None
+
+  return np.searchsorted(keys, queries, side="right" if right else "left").tolist()
+
+def batch_search(haystack, needles, right=False):
+  if not hasattr(needles, "__len__"):
+    needles = list(needles)
+
+  if (positions:=numpy_batch_search(haystack, needles, right)) != None:
+    return positions
+
+  needles = list(needles)
+
+  # Sorted needles only ever move forward, so each search can start where the last one ended
+  if all(a <= b for a, b in zip(needles, itertools.islice(needles, 1, None))):
+    positions = []
+
+    lo = 0
+    for needle in needles:
+      lo = gallop(haystack, needle, lo, right)
+      positions.append(lo)
+
+    return positions
+
+  search = bisect_right if right else bisect_left
+  return [search(haystack, needle) for needle in needles]
+
+def batch_binary_search(haystack, needles):
+  needles = list(needles)
+  positions = batch_search(haystack, needles)
+
+  return [i < len(haystack) and haystack[i] == needle for i, needle in zip(positions, needles)]
+
+class EytzingerIndex:
+  def __init__(self, haystack):
+    self.size = len(haystack)
+    self.keys = [None] * (self.size + 1)
+    self.positions = [self.size] * (self.size + 1)
+
+    # Lay the sorted haystack out in breadth-first order, 1-indexed like a heap
+    i = 0
+    stack = [(1, False)]
+    while stack:
+      k, visited = stack.pop()
+      if k > self.size:
+        continue
+
+      if visited:
+        self.keys[k] = haystack[i]
+        self.positions[k] = i
+        i += 1
+      else:
+        stack.append((2 * k + 1, False))
+        stack.append((k, True))
+        stack.append((2 * k, False))
+
+  def search(self, needle, right=False):
+    keys = self.keys
+
+    k = 1
+    while k <= self.size:
+      k = 2 * k + (keys[k] <= needle if right else keys[k] < needle)
+
+    # Undo the trailing right turns, plus one left turn, to land on the answer
+    k >>= ((~k) & (k + 1)).bit_length()
+
+    return self.positions[k] if k != 0 else self.size
+
+  def batch_search(self, needles, right=False):
+    return [self.search(needle, right) for needle in needles]
+
 if __name__ == "__main__":
   haystack = random_ordered_list()
   needle = random.randint(1, 20)
@@ -35,4 +131,15 @@ if __name__ == "__main__":
     print("Needle in haystack: " + str(complete_search(haystack, needle)))
   
   elif EXTRA == 1:
-    print("Needle in haystack: " + str(binary_search(haystack, needle)))
\ No newline at end of file
+    print("Needle in haystack: " + str(binary_search(haystack, needle)))
+
+  elif EXTRA == 2:
+    needles = [random.randint(1, 20) for i in range(5)]
+
+    print("Needles: " + str(needles))
+    print("Positions: " + str(batch_search(haystack, needles)))
+    print("Needles in haystack: " + str(batch_binary_search(haystack, needles)))
+
+  elif EXTRA == 3:
+    index = EytzingerIndex(haystack)
+    print("Position: " + str(index.search(needle)))
\ No newline at end of file
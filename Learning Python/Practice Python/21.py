@@ -4,25 +4,40 @@ from bs4 import BeautifulSoup
 import requests
 import codecs
 
+from html_extract import extract_stream
+
 EXTRA = 0
 
+CHUNK_SIZE = 1 << 16
+
 if __name__ == "__main__":
   url = "http://www.vanityfair.com/society/2014/06/monica-lewinsky-humiliation-culture"
-  html = requests.get(url).text
-
-  soup = BeautifulSoup(html)
-
-  p_list = soup.find_all("p", {"class": "paywall"})
-  p_string_list = list(filter(lambda x: x != None, map(lambda x: x.string, p_list)))
-  p_string = "\n".join(p_string_list)
 
   filename = ""
-  if EXTRA == 0:
+  if EXTRA == 0 or EXTRA == 2:
     filename = "21.txt"
 
   elif EXTRA == 1:
     filename = input("File Name: ")
 
-  # with codecs.open(filename, 'w', "utf-16") as f:
-  with open(filename, 'w') as f:
-    f.write(p_string)
\ No newline at end of file
+  if EXTRA == 2:
+    # Paragraphs are written out as the page downloads, so neither the page nor the text is ever held whole
+    with requests.get(url, stream=True) as response, open(filename, 'w') as f:
+      chunks = response.iter_content(CHUNK_SIZE, decode_unicode=True)
+      p_string_list = filter(lambda x: x != None, extract_stream(chunks, "p", {"class": "paywall"}))
+
+      for i, p_string in enumerate(p_string_list):
+        f.write(("\n" if i != 0 else "") + p_string)
+
+  else:
+    html = requests.get(url).text
+
+    soup = BeautifulSoup(html)
+
+    p_list = soup.find_all("p", {"class": "paywall"})
+    p_string_list = list(filter(lambda x: x != None, map(lambda x: x.string, p_list)))
+    p_string = "\n".join(p_string_list)
+
+    # with codecs.open(filename, 'w', "utf-16") as f:
+    with open(filename, 'w') as f:
+      f.write(p_string)
\ No newline at end of file
@@ -1,36 +1,111 @@
 # Read From File
 
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
 import re
+import tempfile
+import time
 
 EXTRA = 1
 
+CHUNK_SIZE = 1 << 24
+
+category_pattern = re.compile(rb"(?<=/./).+(?=/.+\.jpg)")
+
+def get_category(line):
+  # Paths look like `/a/abbey/sun_*.jpg`, which a split handles without the regex
+  parts = line.split(b'/')
+  if len(parts) >= 4 and parts[0] == b"" and len(parts[1]) == 1 and len(parts[-1]) > 4 and parts[-1].endswith(b".jpg"):
+    return b'/'.join(parts[2:-1])
+
+  if (key:=category_pattern.search(line)) == None:
+    return None
+
+  return key.group()
+
+def count_chunk(filename, start, end):
+  counts = Counter()
+
+  with open(filename, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+      for line in data[start:end].splitlines():
+        if (key:=get_category(line)) != None:
+          counts[key] += 1
+
+  return counts
+
+def get_chunks(filename, chunk_size=CHUNK_SIZE):
+  chunks = []
+
+  with open(filename, 'rb') as f:
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+      return chunks
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+      start = 0
+      while start < size:
+        # Every chunk ends just past a newline, so no line is split between two workers
+        end = data.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+
+        chunks.append((start, end))
+        start = end
+
+  return chunks
+
+def count_categories(filename, workers=None, chunk_size=CHUNK_SIZE):
+  chunks = get_chunks(filename, chunk_size)
+
+  counts = Counter()
+  with ProcessPoolExecutor(workers) as executor:
+    futures = [executor.submit(count_chunk, filename, start, end) for start, end in chunks]
+    for future in futures:
+      counts.update(future.result())
+
+  return Counter({key.decode(): value for key, value in counts.items()})
+
 if __name__ == "__main__":
   if EXTRA == 0:
-    counts = {}
+    counts = Counter()
 
     with open("22a.txt", 'r') as f:
-      while key:=f.readline():
-        key = key.strip()
-        if key not in counts.keys():
-          counts[key] = 0
-        counts[key] += 1
-    
+      for key in f:
+        counts[key.strip()] += 1
+
     for key, value in counts.items():
       print(str(key) + ": " + str(value))
 
   elif EXTRA == 1:
-    counts = {}
-
-    with open("22b.txt", 'r') as f:
-      while key:=f.readline():
-        key = re.search(r"(?<=/./).+(?=/.+\.jpg)", key)
-        if key == None:
-          continue
-        key = key.group()
-
-        if key not in counts.keys():
-          counts[key] = 0
-        counts[key] += 1
-    
+    counts = count_categories("22b.txt")
+
     for key, value in counts.items():
-      print(str(key) + ": " + str(value))
\ No newline at end of file
+      print(str(key) + ": " + str(value))
+
+  elif EXTRA == 2:
+    counts = count_categories("22b.txt")
+
+    for key, value in counts.most_common(10):
+      print(str(key) + ": " + str(value))
+
+  elif EXTRA == 3:
+    with open("22b.txt", 'rb') as f:
+      lines = f.read().rstrip(b'\n') + b'\n'
+
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, "22b.txt")
+      with open(filename, 'wb') as f:
+        for i in range(200):
+          f.write(lines)
+
+      for workers in [1, 2, 4, 8]:
+        if workers > os.cpu_count():
+          break
+
+        start = time.perf_counter()
+        count_categories(filename, workers, os.path.getsize(filename) // (4 * workers) + 1)
+        elapsed = time.perf_counter() - start
+
+        print(f"{workers} workers: {elapsed:.2f}s")
@@ -1,5 +1,10 @@
 # File Overlap
 
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Sequence
+import itertools
+
 def get_numbers_from_file(filename):
   numbers = []
 
@@ -9,8 +14,99 @@ def get_numbers_from_file(filename):
   
   return numbers
 
+def is_sorted(x):
+  return all(a <= b for a, b in zip(x, itertools.islice(x, 1, None)))
+
+def gallop(haystack, needle, lo):
+  hi, step = lo, 1
+  while hi < len(haystack) and haystack[hi] < needle:
+    lo = hi + 1
+    hi += step
+    step *= 2
+
+  return bisect_left(haystack, needle, lo, min(hi, len(haystack)))
+
+def sorted_intersection(stream, haystack):
+  i = 0
+
+  # Exponential search only pays for the gaps it skips, so skewed sizes stay cheap
+  for x in stream:
+    i = gallop(haystack, x, i)
+    if i == len(haystack):
+      return
+
+    if haystack[i] == x:
+      yield x
+      i += 1
+
+def hash_intersection(stream, others, multiset):
+  if multiset:
+    counts = [Counter(other) for other in others]
+
+    for x in stream:
+      if all(count[x] > 0 for count in counts):
+        for count in counts:
+          count[x] -= 1
+        yield x
+
+  else:
+    members = [set(other) for other in others]
+    members.sort(key=len)
+    seen = set()
+
+    for x in stream:
+      if x not in seen and all(x in member for member in members):
+        seen.add(x)
+        yield x
+
+def numpy_unique(array):
+  import numpy as np
+
+  # A plain sort and a scan for boundaries, since `np.unique` is far slower than `np.sort` on large integer arrays
+  values = np.sort(array, axis=None)
+  starts = np.flatnonzero(np.concatenate(([len(values) != 0], values[1:] != values[:-1])))
+
+  return values[starts], np.diff(np.append(starts, len(values)))
+
+def numpy_intersection(arrays, multiset):
+  import numpy as np
+
+  values, counts = numpy_unique(arrays[0])
+  for other in arrays[1:]:
+    other_values, other_counts = numpy_unique(other)
+
+    positions = np.searchsorted(other_values, values)
+    found = positions < len(other_values)
+    found[found] = other_values[positions[found]] == values[found]
+
+    values = values[found]
+    counts = np.minimum(counts[found], other_counts[positions[found]])
+
+  # Under multiset semantics each value is kept as many times as the array with the fewest copies holds it
+  return np.repeat(values, counts) if multiset else values
+
+def intersect(*iterables, multiset=False):
+  # Numeric arrays are intersected whole by NumPy, which is only imported when such arrays are passed in
+  if len(iterables) != 0 and all(hasattr(x, "dtype") and x.dtype.kind in "iuf" for x in iterables):
+    return iter(numpy_intersection(iterables, multiset).tolist())
+
+  lists = [x if isinstance(x, Sequence) else list(x) for x in iterables]
+  if len(lists) == 0:
+    return iter([])
+
+  lists.sort(key=len)
+
+  if all(is_sorted(x) for x in lists):
+    stream = iter(lists[0]) if multiset else (x for x, group in itertools.groupby(lists[0]))
+    for other in lists[1:]:
+      stream = sorted_intersection(stream, other)
+    return stream
+
+  # Stream the largest list and only hash the smaller ones
+  return hash_intersection(iter(lists[-1]), lists[:-1], multiset)
+
 def get_overlap(list1, list2):
-  return list(set(list1).intersection(set(list2)))
+  return list(intersect(list1, list2))
 
 if __name__ == "__main__":
   prime_numbers = get_numbers_from_file("23a.txt")
@@ -1,16 +1,16 @@
 # Draw A Game Board
 
-def draw_board(width, height):
-  def draw_horizontal():
-    print(' ' + "--- " * width)
+from functools import lru_cache
+
+@lru_cache
+def get_board_string(width, height):
+  horizontal = ' ' + "--- " * width
+  vertical = '|' + "   |" * width
 
-  def draw_vertical():
-    print('|' + "   |" * width)
+  return "\n".join([horizontal] + [vertical, horizontal] * height)
 
-  draw_horizontal()
-  for i in range(height):
-    draw_vertical()
-    draw_horizontal()
+def draw_board(width, height):
+  print(get_board_string(width, height))
 
 if __name__ == "__main__":
   draw_board(3, 3)
\ No newline at end of file
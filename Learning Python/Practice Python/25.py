@@ -1,52 +1,208 @@
 # Guessing Game Two
 
+from bisect import bisect_left
+import itertools
+import math
+import random
+import time
+
+EXTRA = 0
+
 class GuessingStrategy:
   TOO_HIGH = 0
   TOO_LOW = 1
 
-  def __init__(self):
-    self.l = 0
-    self.r = 100
+  __slots__ = ("l", "r", "integer", "current")
+
+  def __init__(self, lower=0, upper=100):
+    self.l = lower
+    self.r = upper
+    self.integer = isinstance(lower, int) and isinstance(upper, int)
+    self.current = self.__get_midpoint()
+
+  def __get_midpoint(self):
+    if self.integer:
+      return self.l + (self.r - self.l) // 2
+
+    return self.l + (self.r - self.l) / 2
 
   def guess(self):
-    return self.l + (self.r - self.l) // 2
-  
+    return self.current
+
   def update(self, feedback):
     if feedback == GuessingStrategy.TOO_HIGH:
-      self.r = self.guess() - 1
+      self.r = self.current - 1 if self.integer else self.current
 
     elif feedback == GuessingStrategy.TOO_LOW:
-      self.l = self.guess() + 1
+      self.l = self.current + 1 if self.integer else self.current
 
-if __name__ == "__main__":
-  playing = True
-  while playing:
-    guesser = GuessingStrategy()
+    self.current = self.__get_midpoint()
+
+class ProbabilisticGuessingStrategy:
+  __slots__ = ("integer", "error_rate", "bounds", "weights", "current")
+
+  def __init__(self, lower=0, upper=100, error_rate=0.1):
+    # With no lies a side of the range would drop to zero weight, which is what `GuessingStrategy` is for,
+    # and from one half on the feedback tells nothing
+    if not 0 < error_rate < 0.5:
+      raise ValueError("error rate must be between 0 and 0.5")
 
-    guessing = True
-    while guessing:
-      feedback = input(f"Is {guesser.guess()} >, < or = to your number (or `exit` to exit)? ").strip().lower()
+    self.integer = isinstance(lower, int) and isinstance(upper, int)
+    self.error_rate = error_rate
 
-      if feedback == "exit":
-        guessing = False
+    # The belief over the range is piecewise constant: `weights[i]` is the density between `bounds[i]` and `bounds[i + 1]`
+    self.bounds = [lower, upper + 1 if self.integer else upper]
+    self.weights = [1.0 / (self.bounds[1] - self.bounds[0])]
+    self.current = self.__get_median()
+
+  def __get_median(self):
+    remaining = 0.5
+    for i, weight in enumerate(self.weights):
+      width = self.bounds[i + 1] - self.bounds[i]
+      if weight * width >= remaining or i == len(self.weights) - 1:
+        median = self.bounds[i] + remaining / weight
         break
+      remaining -= weight * width
+
+    if self.integer:
+      return min(max(math.floor(median), self.bounds[i]), self.bounds[i + 1] - 1)
+
+    return median
+
+  def __split(self, boundary):
+    i = bisect_left(self.bounds, boundary)
+    if i < len(self.bounds) and self.bounds[i] == boundary:
+      return i
+
+    self.bounds.insert(i, boundary)
+    self.weights.insert(i, self.weights[i - 1])
+    return i
+
+  def guess(self):
+    return self.current
+
+  def update(self, feedback):
+    if feedback == GuessingStrategy.TOO_HIGH:
+      boundary = self.current
+    elif feedback == GuessingStrategy.TOO_LOW:
+      boundary = self.current + 1 if self.integer else self.current
+    else:
+      return
+
+    # Everything on the side the feedback points to becomes likelier, since the feedback may be a lie
+    if self.bounds[0] < boundary < self.bounds[-1]:
+      split = self.__split(boundary)
+    else:
+      split = 0 if boundary <= self.bounds[0] else len(self.weights)
+
+    below = 1 - self.error_rate if feedback == GuessingStrategy.TOO_HIGH else self.error_rate
+    above = 1 - below
+
+    total = 0
+    for i in range(len(self.weights)):
+      self.weights[i] *= below if i < split else above
+      total += self.weights[i] * (self.bounds[i + 1] - self.bounds[i])
+
+    for i in range(len(self.weights)):
+      self.weights[i] /= total
+
+    self.current = self.__get_median()
+
+class GuessingSessions:
+  def __init__(self):
+    self.sessions = {}
+    self.ids = itertools.count()
+
+  def create(self, lower=0, upper=100, error_rate=0):
+    if error_rate == 0:
+      strategy = GuessingStrategy(lower, upper)
+    else:
+      strategy = ProbabilisticGuessingStrategy(lower, upper, error_rate)
+
+    session = next(self.ids)
+    self.sessions[session] = strategy
+    return session
+
+  def guess(self, session):
+    return self.sessions[session].guess()
+
+  def update(self, session, feedback):
+    strategy = self.sessions[session]
+    strategy.update(feedback)
+    return strategy.guess()
+
+  def close(self, session):
+    del self.sessions[session]
+
+  def __len__(self):
+    return len(self.sessions)
+
+def get_feedback(guess, target, error_rate=0):
+  if guess == target:
+    return None
+
+  feedback = GuessingStrategy.TOO_HIGH if guess > target else GuessingStrategy.TOO_LOW
+  if random.random() < error_rate:
+    feedback = GuessingStrategy.TOO_LOW if feedback == GuessingStrategy.TOO_HIGH else GuessingStrategy.TOO_HIGH
+
+  return feedback
+
+if __name__ == "__main__":
+  if EXTRA == 0:
+    playing = True
+    while playing:
+      guesser = GuessingStrategy()
+
+      guessing = True
+      while guessing:
+        feedback = input(f"Is {guesser.guess()} >, < or = to your number (or `exit` to exit)? ").strip().lower()
+
+        if feedback == "exit":
+          guessing = False
+          break
+
+        if feedback == '>':
+          guesser.update(GuessingStrategy.TOO_HIGH)
+
+        elif feedback == '<':
+          guesser.update(GuessingStrategy.TOO_LOW)
+
+        elif feedback == '=':
+          guessing = False
+
+      deciding = True
+      while deciding:
+        decision = input("Play again (Y/n): ").strip().lower()
+
+        if decision == 'y':
+          deciding = False
+
+        elif decision == 'n':
+          deciding = False
+          playing = False
+
+  elif EXTRA == 1:
+    for error_rate in [0, 0.1, 0.2]:
+      sessions = GuessingSessions()
+      targets = {}
+      for i in range(10000):
+        session = sessions.create(0, 1000000, error_rate)
+        targets[session] = random.randint(0, 1000000)
+
+      start = time.perf_counter()
+      rounds, guesses = 0, 0
+      while len(sessions) != 0 and rounds < 200:
+        # Every open game gets one move per round, as a server would interleave them
+        for session in list(sessions.sessions):
+          feedback = get_feedback(sessions.guess(session), targets[session], error_rate)
+          guesses += 1
+
+          if feedback == None:
+            sessions.close(session)
+          else:
+            sessions.update(session, feedback)
+
+        rounds += 1
+      elapsed = time.perf_counter() - start
 
-      if feedback == '>':
-        guesser.update(GuessingStrategy.TOO_HIGH)
-      
-      elif feedback == '<':
-        guesser.update(GuessingStrategy.TOO_LOW)
-
-      elif feedback == '=':
-        guessing = False
-    
-    deciding = True
-    while deciding:
-      decision = input("Play again (Y/n): ").strip().lower()
-
-      if decision == 'y':
-        deciding = False
-      
-      elif decision == 'n':
-        deciding = False
-        playing = False
\ No newline at end of file
+      print(f"Error rate {error_rate}: {guesses / 10000:.1f} guesses per game, {guesses / elapsed:.0f} guesses/s, {len(sessions)} unfinished")
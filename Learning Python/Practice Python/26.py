@@ -1,88 +1,142 @@
 # Check Tic Tac Toe
 
+from array import array
+from collections import Counter
+from functools import lru_cache
+import itertools
+import os
+import random
+import tempfile
+import time
+
+EXTRA = 0
+
+BATCH_SIZE = 65536
+
+# Boards are packed as base-3 integers, with the top-left cell as the most significant digit
+POWERS = [3 ** (8 - i) for i in range(9)]
+
 class TicTacToe:
+  # Bit `row * 3 + column` of each line: major diagonal, minor diagonal, rows, then columns
+  LINES = [
+    0b100010001, 0b001010100,
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100
+  ]
+
   def __init__(self):
     self.board = [[0] * 3] * 3
-  
-  def __get_winner_major_diagonal(self):
-    for i in range(3):
-      if self.board[i][i] != self.board[0][0]:
-        return 0
-      
-    return self.board[0][0]
-  
-  def __get_winner_minor_diagonal(self):
-    for i in range(3):
-      if self.board[i][2 - i] != self.board[0][2]:
-        return 0
-      
-    return self.board[0][2]
-  
-  def __get_winner_row(self, row):
-    for i in range(3):
-      if self.board[row][i] != self.board[row][0]:
-        return 0
-      
-    return self.board[row][0]
-  
-  def __get_winner_column(self, column):
+
+  def __get_bitboards(self):
+    bitboards = {}
+
     for i in range(3):
-      if self.board[i][column] != self.board[0][column]:
-        return 0
-      
-    return self.board[0][column]
+      for j in range(3):
+        if (player:=self.board[i][j]) != 0:
+          bitboards[player] = bitboards.get(player, 0) | 1 << (i * 3 + j)
+
+    return bitboards
 
   def get_winner(self):
-    if (winner:=self.__get_winner_major_diagonal()) != 0:
-      return winner
-    
-    if (winner:=self.__get_winner_minor_diagonal()) != 0:
-      return winner
-    
-    for i in range(3):
-      if (winner:=self.__get_winner_row(i)) != 0:
-        return winner
-      
-    for i in range(3):
-      if (winner:=self.__get_winner_column(i)) != 0:
-        return winner
-      
+    bitboards = self.__get_bitboards()
+
+    for line in TicTacToe.LINES:
+      for player, bitboard in bitboards.items():
+        if bitboard & line == line:
+          return player
+
     return 0
 
+def encode_board(board):
+  return sum(cell * power for cell, power in zip(itertools.chain(*board), POWERS))
+
+def decode_board(code):
+  cells = [code // power % 3 for power in POWERS]
+  return [cells[0:3], cells[3:6], cells[6:9]]
+
+@lru_cache
+def get_winner_table():
+  tic_tac_toe = TicTacToe()
+
+  winners = bytearray(3 ** 9)
+  for code in range(3 ** 9):
+    tic_tac_toe.board = decode_board(code)
+    winners[code] = tic_tac_toe.get_winner()
+
+  return bytes(winners)
+
+def classify_codes(codes):
+  # One table lookup per board, with the loop itself running in C
+  return bytes(map(get_winner_table().__getitem__, codes))
+
+def classify_array(boards):
+  import numpy as np
+
+  codes = boards.reshape(-1, 9).astype(np.int32) @ np.array(POWERS, dtype=np.int32)
+  return np.frombuffer(get_winner_table(), dtype=np.uint8)[codes]
+
+def read_board_codes(filename, batch_size=BATCH_SIZE):
+  # Board files hold one board per line as nine base-3 digits, e.g. `220210211`
+  with open(filename, 'r') as f:
+    while lines:=f.readlines(batch_size * 10):
+      yield array('H', (int(line, 3) for line in lines if not line.isspace()))
+
+def count_winners(filename, batch_size=BATCH_SIZE):
+  counts = Counter()
+
+  for codes in read_board_codes(filename, batch_size):
+    counts.update(classify_codes(codes))
+
+  return counts
+
 if __name__ == "__main__":
-  winner_is_2 = [[2, 2, 0],
-    [2, 1, 0],
-    [2, 1, 1]]
+  if EXTRA == 0:
+    winner_is_2 = [[2, 2, 0],
+      [2, 1, 0],
+      [2, 1, 1]]
 
-  winner_is_1 = [[1, 2, 0],
-    [2, 1, 0],
-    [2, 1, 1]]
+    winner_is_1 = [[1, 2, 0],
+      [2, 1, 0],
+      [2, 1, 1]]
 
-  winner_is_also_1 = [[0, 1, 0],
-    [2, 1, 0],
-    [2, 1, 1]]
+    winner_is_also_1 = [[0, 1, 0],
+      [2, 1, 0],
+      [2, 1, 1]]
 
-  no_winner = [[1, 2, 0],
-    [2, 1, 0],
-    [2, 1, 2]]
+    no_winner = [[1, 2, 0],
+      [2, 1, 0],
+      [2, 1, 2]]
 
-  also_no_winner = [[1, 2, 0],
-    [2, 1, 0],
-    [2, 1, 0]]
+    also_no_winner = [[1, 2, 0],
+      [2, 1, 0],
+      [2, 1, 0]]
 
-  tic_tac_toe = TicTacToe()
+    tic_tac_toe = TicTacToe()
 
-  tic_tac_toe.board = winner_is_2
-  print(tic_tac_toe.get_winner())
+    tic_tac_toe.board = winner_is_2
+    print(tic_tac_toe.get_winner())
   
-  tic_tac_toe.board = winner_is_1
-  print(tic_tac_toe.get_winner())
+    tic_tac_toe.board = winner_is_1
+    print(tic_tac_toe.get_winner())
   
-  tic_tac_toe.board = winner_is_also_1
-  print(tic_tac_toe.get_winner())
+    tic_tac_toe.board = winner_is_also_1
+    print(tic_tac_toe.get_winner())
   
-  tic_tac_toe.board = no_winner
-  print(tic_tac_toe.get_winner())
+    tic_tac_toe.board = no_winner
+    print(tic_tac_toe.get_winner())
   
-  tic_tac_toe.board = also_no_winner
-  print(tic_tac_toe.get_winner())
\ No newline at end of file
+    tic_tac_toe.board = also_no_winner
+    print(tic_tac_toe.get_winner())
+
+  elif EXTRA == 1:
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, "boards.txt")
+      with open(filename, 'w') as f:
+        for i in range(1000000):
+          f.write("".join(random.choices("012", k=9)) + "\n")
+
+      start = time.perf_counter()
+      counts = count_winners(filename)
+      elapsed = time.perf_counter() - start
+
+      print(f"Classified {sum(counts.values())} boards in {elapsed:.2f}s: {dict(counts)}")
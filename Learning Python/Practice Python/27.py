@@ -1,82 +1,92 @@
 # Tic Tac Toe Draw
 
+from functools import lru_cache
 import re
 
+@lru_cache
+def get_board_template(size):
+  separator = " ---" * size
+  row = '|' + " {} |" * size
+
+  return "\n".join([separator] + [row, separator] * size).strip()
+
 class TicTacToe:
   X = 1
   O = 2
   PLAYERS = [X, O]
   SYMBOLS = [' ', 'X', '0']
 
-  def __init__(self):
-    self.board = [[0] * 3 for i in range(3)]
+  lines = {}
+
+  def __init__(self, size=3, length=None):
+    self.size = size
+    self.length = size if length == None else length
+    self.full = (1 << size * size) - 1
+
+    # One bitboard per player, with bit `row * size + column` set for each of their marks
+    self.bitboards = [0, 0]
     self.player = 0
-  
-  def __get_winner_major_diagonal(self):
-    for i in range(3):
-      if self.board[i][i] != self.board[0][0]:
-        return 0
-      
-    return self.board[0][0]
-  
-  def __get_winner_minor_diagonal(self):
-    for i in range(3):
-      if self.board[i][2 - i] != self.board[0][2]:
-        return 0
-      
-    return self.board[0][2]
-  
-  def __get_winner_row(self, row):
-    for i in range(3):
-      if self.board[row][i] != self.board[row][0]:
-        return 0
-      
-    return self.board[row][0]
-  
-  def __get_winner_column(self, column):
-    for i in range(3):
-      if self.board[i][column] != self.board[0][column]:
-        return 0
-      
-    return self.board[0][column]
+    self.winner = 0
+    self.cell_lines = TicTacToe.__get_lines(self.size, self.length)
 
-  def get_winner(self):
-    if (winner:=self.__get_winner_major_diagonal()) != 0:
-      return winner
-    
-    if (winner:=self.__get_winner_minor_diagonal()) != 0:
-      return winner
-    
-    for i in range(3):
-      if (winner:=self.__get_winner_row(i)) != 0:
-        return winner
-      
-    for i in range(3):
-      if (winner:=self.__get_winner_column(i)) != 0:
-        return winner
-      
-    return 0
+  def __get_lines(size, length):
+    if (size, length) in TicTacToe.lines:
+      return TicTacToe.lines[(size, length)]
 
-  def get_board_string(self):
-    result = " ---" * 3 + '\n'
+    lines = []
+    for row in range(size):
+      for column in range(size):
+        for row_step, column_step in [(1, 1), (1, -1), (0, 1), (1, 0)]:
+          end_row = row + row_step * (length - 1)
+          end_column = column + column_step * (length - 1)
+          if end_row >= size or not 0 <= end_column < size:
+            continue
+
+          line = 0
+          for i in range(length):
+            line |= 1 << ((row + row_step * i) * size + column + column_step * i)
+          lines.append(line)
 
-    for i in range(3):
-      result += '|'
-      for j in range(3):
-        result += f" {TicTacToe.SYMBOLS[self.board[i][j]]} |"
+    # Only the lines through the cell just played can have been completed by it
+    cell_lines = [[line for line in lines if line >> cell & 1] for cell in range(size * size)]
 
-      result += '\n' + " ---" * 3 + '\n'
+    TicTacToe.lines[(size, length)] = cell_lines
+    return cell_lines
 
-    return result.strip()
+  def get_cell(self, row, column):
+    bit = 1 << (row * self.size + column)
+
+    for player in range(len(TicTacToe.PLAYERS)):
+      if self.bitboards[player] & bit:
+        return TicTacToe.PLAYERS[player]
+
+    return 0
+
+  def get_winner(self):
+    return self.winner
+
+  def get_board_string(self):
+    symbols = [TicTacToe.SYMBOLS[self.get_cell(i, j)] for i in range(self.size) for j in range(self.size)]
+
+    return get_board_template(self.size).format(*symbols)
 
   def play_move(self, row, column):
-    if row >= 3 or column >= 3:
+    if not (0 <= row < self.size and 0 <= column < self.size):
       return False
-    
-    if self.board[row][column] != 0:
+
+    cell = row * self.size + column
+    if (self.bitboards[0] | self.bitboards[1]) >> cell & 1:
       return False
-    
-    self.board[row][column] = TicTacToe.PLAYERS[self.player]
+
+    bitboard = self.bitboards[self.player] | 1 << cell
+    self.bitboards[self.player] = bitboard
+
+    if self.winner == 0:
+      for line in self.cell_lines[cell]:
+        if bitboard & line == line:
+          self.winner = TicTacToe.PLAYERS[self.player]
+          break
+
     self.player = (self.player + 1) % len(TicTacToe.PLAYERS)
 
     return True
@@ -1,6 +1,55 @@
 # Tic Tac Toe Game
 
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+import mmap
+import os
 import re
+import struct
+import sys
+import time
+
+EXTRA = 0
+
+SOLVED_MAGIC = b"TTTS"
+SOLVED_VERSION = 1
+SOLVED_HEADER = struct.Struct("<4sBBBxQ")
+
+class BoardRenderer:
+  def __init__(self, width, height):
+    self.template = BoardRenderer.get_template(width, height)
+    self.height = 2 * height + 1
+    self.lines = None
+
+  @lru_cache
+  def get_template(width, height):
+    # The grid never changes, so it is built once and the cells are filled in with `format`
+    separator = " ---" * width
+    row = '|' + " {} |" * width
+
+    return "\n".join([separator] + [row, separator] * height).strip()
+
+  def render(self, symbols):
+    return self.template.format(*symbols)
+
+  def render_changes(self, symbols):
+    lines = self.render(symbols).split('\n')
+
+    if self.lines == None:
+      changes = list(enumerate(lines))
+    else:
+      changes = [(i, line) for i, (line, previous) in enumerate(zip(lines, self.lines)) if line != previous]
+
+    self.lines = lines
+    return changes
+
+  def write_changes(self, symbols, stream=sys.stdout, top=1):
+    # Moves the terminal cursor to each changed line instead of redrawing the whole board
+    # and then clears everything below the board so the messages start fresh
+    changes = "".join(f"\x1b[{top + i};1H{line}\x1b[K" for i, line in self.render_changes(symbols))
+    stream.write(f"{changes}\x1b[{top + self.height};1H\x1b[J\n")
+    stream.flush()
 
 class TicTacToeAPI:
   X = 1
@@ -8,93 +57,321 @@ class TicTacToeAPI:
   PLAYERS = [X, O]
   SYMBOLS = [' ', 'X', 'O']
 
-  def __init__(self):
-    self.board = [[0] * 3 for i in range(3)]
+  lines = {}
+
+  def __init__(self, size=3, length=None):
+    self.size = size
+    self.length = size if length == None else length
+    self.full = (1 << size * size) - 1
+
+    # One bitboard per player, with bit `row * size + column` set for each of their marks
+    self.bitboards = [0, 0]
     self.player = 0
-  
-  def __get_winner_major_diagonal(self):
-    for i in range(3):
-      if self.board[i][i] != self.board[0][0]:
-        return 0
-      
-    return self.board[0][0]
-  
-  def __get_winner_minor_diagonal(self):
-    for i in range(3):
-      if self.board[i][2 - i] != self.board[0][2]:
-        return 0
-      
-    return self.board[0][2]
-  
-  def __get_winner_row(self, row):
-    for i in range(3):
-      if self.board[row][i] != self.board[row][0]:
-        return 0
-      
-    return self.board[row][0]
-  
-  def __get_winner_column(self, column):
-    for i in range(3):
-      if self.board[i][column] != self.board[0][column]:
-        return 0
-      
-    return self.board[0][column]
+    self.winner = 0
+    self.cell_lines = TicTacToeAPI.__get_lines(self.size, self.length)
+
+  def __get_lines(size, length):
+    if (size, length) in TicTacToeAPI.lines:
+      return TicTacToeAPI.lines[(size, length)]
+
+    lines = []
+    for row in range(size):
+      for column in range(size):
+        for row_step, column_step in [(1, 1), (1, -1), (0, 1), (1, 0)]:
+          end_row = row + row_step * (length - 1)
+          end_column = column + column_step * (length - 1)
+          if end_row >= size or not 0 <= end_column < size:
+            continue
+
+          line = 0
+          for i in range(length):
+            line |= 1 << ((row + row_step * i) * size + column + column_step * i)
+          lines.append(line)
+
+    # Only the lines through the cell just played can have been completed by it
+    cell_lines = [[line for line in lines if line >> cell & 1] for cell in range(size * size)]
+
+    TicTacToeAPI.lines[(size, length)] = cell_lines
+    return cell_lines
+
+  def get_cell(self, row, column):
+    bit = 1 << (row * self.size + column)
+
+    for player in range(len(TicTacToeAPI.PLAYERS)):
+      if self.bitboards[player] & bit:
+        return TicTacToeAPI.PLAYERS[player]
 
-  def get_winner(self):
-    if (winner:=self.__get_winner_major_diagonal()) != 0:
-      return winner
-    
-    if (winner:=self.__get_winner_minor_diagonal()) != 0:
-      return winner
-    
-    for i in range(3):
-      if (winner:=self.__get_winner_row(i)) != 0:
-        return winner
-      
-    for i in range(3):
-      if (winner:=self.__get_winner_column(i)) != 0:
-        return winner
-      
     return 0
-  
-  def is_over(self):
-    if self.get_winner() != 0:
-      return True
-    
-    for i in range(3):
-      for j in range(3):
-        if self.board[i][j] == 0:
-          return False
-        
-    return True
 
-  def get_board_string(self):
-    result = " ---" * 3 + '\n'
+  def get_winner(self):
+    return self.winner
 
-    for i in range(3):
-      result += '|'
-      for j in range(3):
-        result += f" {TicTacToeAPI.SYMBOLS[self.board[i][j]]} |"
+  def is_over(self):
+    return self.winner != 0 or self.bitboards[0] | self.bitboards[1] == self.full
 
-      result += '\n' + " ---" * 3 + '\n'
+  def get_symbols(self):
+    return [TicTacToeAPI.SYMBOLS[self.get_cell(i, j)] for i in range(self.size) for j in range(self.size)]
 
-    return result.strip()
+  def get_board_string(self):
+    return BoardRenderer.get_template(self.size, self.size).format(*self.get_symbols())
 
   def play_move(self, row, column):
-    if row >= 3 or column >= 3:
+    if not (0 <= row < self.size and 0 <= column < self.size):
       return False
-    
-    if self.board[row][column] != 0:
+
+    cell = row * self.size + column
+    if (self.bitboards[0] | self.bitboards[1]) >> cell & 1:
       return False
-    
-    self.board[row][column] = TicTacToeAPI.PLAYERS[self.player]
+
+    bitboard = self.bitboards[self.player] | 1 << cell
+    self.bitboards[self.player] = bitboard
+
+    if self.winner == 0:
+      for line in self.cell_lines[cell]:
+        if bitboard & line == line:
+          self.winner = TicTacToeAPI.PLAYERS[self.player]
+          break
+
     self.player = (self.player + 1) % len(TicTacToeAPI.PLAYERS)
 
     return True
   
+class TicTacToeSolver:
+  EXACT = 0
+  LOWER = 1
+  UPPER = 2
+
+  def __init__(self, size=3, length=None):
+    api = TicTacToeAPI(size, length)
+
+    self.size = size
+    self.length = api.length
+    self.cells = size * size
+    self.full = api.full
+    self.cell_lines = api.cell_lines
+
+    # Cells on the most lines are searched first, which makes cutoffs come sooner
+    self.order = sorted(range(self.cells), key=lambda cell: -len(self.cell_lines[cell]))
+    self.symmetries = self.__get_symmetry_tables()
+
+    self.table = {}
+    self.solved = None
+    self.nodes = 0
+    self.probes = 0
+    self.hits = 0
+
+  def __get_symmetry_tables(self):
+    n = self.size - 1
+    transforms = [
+      lambda r, c: (r, c), lambda r, c: (c, n - r), lambda r, c: (n - r, n - c), lambda r, c: (n - c, r),
+      lambda r, c: (r, n - c), lambda r, c: (n - r, c), lambda r, c: (c, r), lambda r, c: (n - c, n - r)
+    ]
+
+    # A position key holds both bitboards, so each byte of it maps to its image through a lookup table
+    symmetries = []
+    for transform in transforms:
+      targets = []
+      for k in range(2 * self.cells):
+        board, cell = divmod(k, self.cells)
+        row, column = transform(*divmod(cell, self.size))
+        targets.append(board * self.cells + row * self.size + column)
+
+      tables = []
+      for start in range(0, 2 * self.cells, 8):
+        table = []
+        for byte in range(256):
+          image = 0
+          for i in range(8):
+            if byte >> i & 1 and start + i < len(targets):
+              image |= 1 << targets[start + i]
+          table.append(image)
+        tables.append(table)
+
+      symmetries.append(tables)
+
+    return symmetries
+
+  def get_key(self, me, opponent):
+    key = me | opponent << self.cells
+
+    best = None
+    for tables in self.symmetries:
+      image, rest = 0, key
+      for table in tables:
+        image |= table[rest & 255]
+        rest >>= 8
+
+      if best == None or image < best:
+        best = image
+
+    return best
+
+  def __wins(self, bitboard, cell):
+    for line in self.cell_lines[cell]:
+      if bitboard & line == line:
+        return True
+
+    return False
+
+  def negamax(self, me, opponent, alpha=-1, beta=1):
+    self.nodes += 1
+
+    occupied = me | opponent
+    if occupied == self.full:
+      return 0
+
+    key = self.get_key(me, opponent)
+    self.probes += 1
+
+    if (entry:=self.table.get(key)) != None:
+      self.hits += 1
+      value, flag = entry
+
+      if flag == TicTacToeSolver.EXACT:
+        return value
+      elif flag == TicTacToeSolver.LOWER:
+        alpha = max(alpha, value)
+      else:
+        beta = min(beta, value)
+
+      if alpha >= beta:
+        return value
+
+    original_alpha = alpha
+    best = -2
+    for cell in self.order:
+      if occupied >> cell & 1:
+        continue
+
+      played = me | 1 << cell
+      if self.__wins(played, cell):
+        value = 1
+      else:
+        value = -self.negamax(opponent, played, -beta, -alpha)
+
+      best = max(best, value)
+      alpha = max(alpha, value)
+      if alpha >= beta:
+        break
+
+    if best <= original_alpha:
+      flag = TicTacToeSolver.UPPER
+    elif best >= beta:
+      flag = TicTacToeSolver.LOWER
+    else:
+      flag = TicTacToeSolver.EXACT
+
+    self.table[key] = (best, flag)
+    return best
+
+  def __get_value(self, me, opponent):
+    if self.solved != None:
+      keys, values = self.solved
+      key = self.get_key(me, opponent)
+      i = bisect_left(keys, key)
+      if i < len(keys) and keys[i] == key:
+        return values[i]
+
+    return self.negamax(me, opponent)
+
+  def best_move(self, api):
+    if api.is_over():
+      return None
+
+    me = api.bitboards[api.player]
+    opponent = api.bitboards[1 - api.player]
+    occupied = me | opponent
+
+    best, best_value = None, None
+    for cell in self.order:
+      if occupied >> cell & 1:
+        continue
+
+      played = me | 1 << cell
+      if self.__wins(played, cell):
+        value = 1
+      elif played | opponent == self.full:
+        value = 0
+      else:
+        value = -self.__get_value(opponent, played)
+
+      if best_value == None or value > best_value:
+        best, best_value = cell, value
+
+    return divmod(best, self.size)
+
+  def __solve_exact(self, me, opponent, values):
+    key = self.get_key(me, opponent)
+    if key in values:
+      return values[key]
+
+    occupied = me | opponent
+    best = -1 if occupied != self.full else 0
+    for cell in self.order:
+      if occupied >> cell & 1:
+        continue
+
+      played = me | 1 << cell
+      if self.__wins(played, cell):
+        best = 1
+      elif played | opponent == self.full:
+        best = max(best, 0)
+      else:
+        best = max(best, -self.__solve_exact(opponent, played, values))
+
+    values[key] = best
+    return best
+
+  def dump(self, filename):
+    values = {}
+    self.__solve_exact(0, 0, values)
+
+    keys = sorted(values)
+
+    # Written to the side first so that an interrupted dump never leaves a truncated table to be loaded
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    try:
+      with open(temporary, 'wb') as f:
+        f.write(SOLVED_HEADER.pack(SOLVED_MAGIC, SOLVED_VERSION, self.size, self.length, len(keys)))
+        f.write(array('Q', keys))
+        f.write(array('b', [values[key] for key in keys]))
+      os.replace(temporary, filename)
+
+    finally:
+      if os.path.exists(temporary):
+        os.remove(temporary)
+
+  def load(self, filename):
+    try:
+      with open(filename, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+      return False
+
+    if len(data) < SOLVED_HEADER.size:
+      data.close()
+      return False
+
+    magic, version, size, length, count = SOLVED_HEADER.unpack_from(data)
+    if (magic, version, size, length) != (SOLVED_MAGIC, SOLVED_VERSION, self.size, self.length) or len(data) != SOLVED_HEADER.size + 9 * count:
+      data.close()
+      return False
+
+    keys = memoryview(data)[SOLVED_HEADER.size:SOLVED_HEADER.size + 8 * count].cast('Q')
+    values = memoryview(data)[SOLVED_HEADER.size + 8 * count:].cast('b')
+    self.solved = (keys, values)
+
+    return True
+
 class TicTacToeGame:
-  def __init__(self):
+  def __init__(self, solver=None):
     self.api = TicTacToeAPI()
+    self.solver = solver
+
+    # Only a terminal understands the cursor moves, anything else gets the whole board after every move
+    self.renderer = None
+    if sys.stdout.isatty():
+      self.renderer = BoardRenderer(self.api.size, self.api.size)
 
   def __get_input():
     user_input = input("Row, column: ").strip()
@@ -105,20 +382,34 @@ class TicTacToeGame:
     
     return (int(user_coordinates.group(1)), int(user_coordinates.group(2)))
   
+  def __show_board(self):
+    if self.renderer != None:
+      self.renderer.write_changes(self.api.get_symbols())
+    else:
+      print(self.api.get_board_string())
+      print()
+
   def play(self):
+    if self.renderer != None:
+      sys.stdout.write("\x1b[2J")
+      self.__show_board()
+
     while True:
       player = TicTacToeAPI.SYMBOLS[TicTacToeAPI.PLAYERS[self.api.player]]
       print(f"Player `{player}`'s move!")
 
-      move = TicTacToeGame.__get_input()
+      # The computer, when there is one, plays `O`
+      if self.solver != None and TicTacToeAPI.PLAYERS[self.api.player] == TicTacToeAPI.O:
+        move = self.solver.best_move(self.api)
+      else:
+        move = TicTacToeGame.__get_input()
+
       if move == None:
         continue
 
       row, column = move
       self.api.play_move(row, column)
-      print(self.api.get_board_string())
-
-      print()
+      self.__show_board()
 
       if self.api.is_over():
         if (winner:=self.api.get_winner()) != 0:
@@ -131,28 +422,47 @@ class TicTacToeGame:
           return None
   
 if __name__ == "__main__":
-  scores = {'X': 0, 'O': 0}
-
-  playing = True
-  while playing:
-    game = TicTacToeGame()
-    winner = game.play()
-    if winner != None:
-      scores[winner] += 1
-
-    print()
-    print(f"The current score is {scores['X']} to {scores['O']}.")
-    print()
+  if EXTRA == 0 or EXTRA == 1:
+    solver = None
+    if EXTRA == 1:
+      solver = TicTacToeSolver()
+      if not solver.load("29.solved"):
+        solver.dump("29.solved")
+        solver.load("29.solved")
+
+    scores = {'X': 0, 'O': 0}
+
+    playing = True
+    while playing:
+      game = TicTacToeGame(solver)
+      winner = game.play()
+      if winner != None:
+        scores[winner] += 1
+
+      print()
+      print(f"The current score is {scores['X']} to {scores['O']}.")
+      print()
     
-    deciding = True
-    while deciding:
-      decision = input("Play again (Y/n)? ").strip().lower()
+      deciding = True
+      while deciding:
+        decision = input("Play again (Y/n)? ").strip().lower()
 
-      if decision == 'y':
-        deciding = False
+        if decision == 'y':
+          deciding = False
       
-      elif decision == 'n':
-        deciding = False
-        playing = False
+        elif decision == 'n':
+          deciding = False
+          playing = False
+
+      print()
+
+  elif EXTRA == 2:
+    for size in [3, 4]:
+      solver = TicTacToeSolver(size)
+
+      start = time.perf_counter()
+      value = solver.negamax(0, 0)
+      elapsed = time.perf_counter() - start
 
-    print()
\ No newline at end of file
+      print(f"{size}x{size}: value {value}, {solver.nodes} nodes in {elapsed:.2f}s ({solver.nodes / elapsed:.0f} nodes/s), ", end="")
+      print(f"{solver.hits / solver.probes:.1%} table hit rate, {len(solver.table)} entries")
@@ -1,5 +1,7 @@
 # List Less Than Ten
 
+from bisect import bisect_left
+
 EXTRA = 0
 
 if __name__ == "__main__":
@@ -8,16 +10,7 @@ if __name__ == "__main__":
   if EXTRA == 0:
     a.sort()
 
-    l, r = 0, len(a)
-    while l < r:
-      m = l + (r - l) // 2
-      if a[m] < 5:
-        l = m + 1
-      else:
-        r = m
-    
-    for i in range(l):
-      print(a[i], end=" ")
+    print(*a[:bisect_left(a, 5)])
     
   elif EXTRA == 1:
     b = []
@@ -33,4 +26,5 @@ if __name__ == "__main__":
   elif EXTRA == 3:
     threshold = int(input("Threshold: "))
 
-    print(list(filter(lambda x: x < threshold, a)))
\ No newline at end of file
+    a.sort()
+    print(a[:bisect_left(a, threshold)])
\ No newline at end of file
@@ -1,11 +1,19 @@
 # Pick Word
 
-import random
+from word_store import WordStore
+
+EXTRA = 0
 
 if __name__ == "__main__":
-  words = []
-  with open("30.txt", 'r') as f:
-    while word:=f.readline():
-      words.append(word.strip())
+  if EXTRA == 0:
+    words = WordStore()
+
+    print(words.random_word())
+
+  elif EXTRA == 1:
+    words = WordStore()
+
+    length = int(input("Length: "))
+    letters = input("Letters: ").strip().lower()
 
-  print(words[random.randint(0, len(words) - 1)])
\ No newline at end of file
+    print(words.random_word(length, letters or None))
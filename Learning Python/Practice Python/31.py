@@ -1,24 +1,22 @@
 # Pick Word
 
-import random
 import re
 
+from word_store import WordStore
+
 class Hangman:
   words = None
 
   def __init__(self):
     if Hangman.words == None:
-      Hangman.words = []
-      with open("30.txt", 'r') as f:
-        while word:=f.readline():
-          Hangman.words.append(word.strip().lower())
+      Hangman.words = WordStore()
 
     self.word = Hangman.__get_random_word()
     self.mask = ['_'] * len(self.word)
     self.guessed = set()
 
   def __get_random_word():
-    return Hangman.words[random.randint(0, len(Hangman.words) - 1)]
+    return Hangman.words.random_word().lower()
   
   def guess_letter(self, letter):
     if letter in self.guessed:
@@ -1,17 +1,24 @@
 # Hangman
 
-import random
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
 import re
+import string
+import time
+
+from word_store import WordStore
+
+EXTRA = 0
+
+LETTERS = string.ascii_lowercase
 
 class HangmanAPI:
   words = None
 
   def __init__(self):
     if HangmanAPI.words == None:
-      HangmanAPI.words = []
-      with open("30.txt", 'r') as f:
-        while word:=f.readline():
-          HangmanAPI.words.append(word.strip().lower())
+      HangmanAPI.words = WordStore()
 
     self.word = HangmanAPI.__get_random_word()
     self.mask = ['_'] * len(self.word)
@@ -21,7 +28,7 @@ class HangmanAPI:
     self.guessed = set()
 
   def __get_random_word():
-    return HangmanAPI.words[random.randint(0, len(HangmanAPI.words) - 1)]
+    return HangmanAPI.words.random_word().lower()
   
   def is_win(self):
     return self.correct_count == len(self.word)
@@ -100,23 +107,165 @@ class HangmanGame:
           print(f"The word was: {self.api.word.upper()}")
           return False
 
+class HangmanSolver:
+  ENTROPY = 0
+  FREQUENCY = 1
+
+  universes = {}
+
+  def __init__(self, length, strategy=ENTROPY):
+    if HangmanAPI.words == None:
+      HangmanAPI.words = WordStore()
+
+    self.length = length
+    self.strategy = strategy
+    self.words, self.contains, self.positions = HangmanSolver.__get_universe(length)
+
+    # Candidates are a bitset over the words of this length, so each filter is a few big-int operations
+    self.candidates = (1 << len(self.words)) - 1
+    self.guessed = set()
+
+  def __get_universe(length):
+    if length in HangmanSolver.universes:
+      return HangmanSolver.universes[length]
+
+    store = HangmanAPI.words
+    if length <= store.max_length:
+      words = [store.get_word(i).lower() for i in range(store.starts[length], store.starts[length + 1])]
+    else:
+      words = []
+
+    contains = {letter: bytearray((len(words) + 7) // 8) for letter in LETTERS}
+    positions = [{letter: bytearray((len(words) + 7) // 8) for letter in LETTERS} for i in range(length)]
+    for j, word in enumerate(words):
+      byte, bit = j >> 3, 1 << (j & 7)
+      for i, letter in enumerate(word):
+        if letter in contains:
+          contains[letter][byte] |= bit
+          positions[i][letter][byte] |= bit
+
+    contains = {letter: int.from_bytes(bits, "little") for letter, bits in contains.items()}
+    positions = [{letter: int.from_bytes(bits, "little") for letter, bits in position.items()} for position in positions]
+
+    HangmanSolver.universes[length] = (words, contains, positions)
+    return HangmanSolver.universes[length]
+
+  def update(self, letter, mask):
+    self.guessed.add(letter)
+
+    if letter not in mask:
+      self.candidates &= ~self.contains[letter]
+      return
+
+    for i in range(self.length):
+      if mask[i] == letter:
+        self.candidates &= self.positions[i][letter]
+      else:
+        self.candidates &= ~self.positions[i][letter]
+
+  def get_candidates(self):
+    return [self.words[j] for j in range(len(self.words)) if self.candidates >> j & 1]
+
+  def __get_entropy(self, letter, total):
+    groups = [self.candidates & ~self.contains[letter], self.candidates & self.contains[letter]]
+
+    # Split the candidates by which positions reveal the letter
+    for i in range(self.length):
+      position = self.positions[i][letter]
+      groups = [part for group in groups for part in (group & position, group & ~position) if part != 0]
+
+    entropy = 0
+    for group in groups:
+      p = group.bit_count() / total
+      entropy -= p * math.log2(p)
+
+    return entropy
+
+  def guess(self):
+    total = self.candidates.bit_count()
+    best, best_score = None, None
+
+    for letter in LETTERS:
+      if letter in self.guessed:
+        continue
+
+      count = (self.candidates & self.contains[letter]).bit_count()
+      if count == 0 and total != 0:
+        continue
+
+      if self.strategy == HangmanSolver.ENTROPY and total != 0:
+        score = (self.__get_entropy(letter, total), count)
+      else:
+        score = (count,)
+
+      if best_score == None or score > best_score:
+        best, best_score = letter, score
+
+    return best
+
+def play_headless(strategy=HangmanSolver.ENTROPY):
+  api = HangmanAPI()
+  solver = HangmanSolver(len(api.word), strategy)
+
+  guesses = 0
+  while not api.is_over():
+    letter = solver.guess()
+    if letter == None:
+      break
+
+    api.guess_letter(letter)
+    solver.update(letter, api.mask)
+    guesses += 1
+
+  return api.is_win(), guesses
+
+def play_headless_games(count, strategy=HangmanSolver.ENTROPY):
+  wins, guesses = 0, 0
+
+  for i in range(count):
+    win, game_guesses = play_headless(strategy)
+    wins += win
+    guesses += game_guesses
+
+  return wins, guesses
+
+def simulate(games, strategy=HangmanSolver.ENTROPY, workers=None):
+  workers = workers or os.cpu_count()
+  counts = [games // workers + (i < games % workers) for i in range(workers)]
+
+  start = time.perf_counter()
+  with ProcessPoolExecutor(workers) as executor:
+    results = list(executor.map(play_headless_games, counts, [strategy] * workers))
+  elapsed = time.perf_counter() - start
+
+  wins = sum(result[0] for result in results)
+  guesses = sum(result[1] for result in results)
+
+  return wins / games, guesses / elapsed
+
 if __name__ == "__main__":
-  playing = True
-  while playing:
-    game = HangmanGame()
-    game.play()
+  if EXTRA == 0:
+    playing = True
+    while playing:
+      game = HangmanGame()
+      game.play()
 
-    print()
+      print()
     
-    deciding = True
-    while deciding:
-      decision = input("Play again (Y/n)? ").strip().lower()
+      deciding = True
+      while deciding:
+        decision = input("Play again (Y/n)? ").strip().lower()
 
-      if decision == 'y':
-        deciding = False
+        if decision == 'y':
+          deciding = False
       
-      elif decision == 'n':
-        deciding = False
-        playing = False
+        elif decision == 'n':
+          deciding = False
+          playing = False
+
+      print()
 
-    print()
\ No newline at end of file
+  elif EXTRA == 1:
+    for name, strategy in [("Entropy", HangmanSolver.ENTROPY), ("Frequency", HangmanSolver.FREQUENCY)]:
+      win_rate, guess_rate = simulate(1000, strategy)
+      print(f"{name}: {win_rate:.1%} win rate, {guess_rate:.0f} guesses/s")
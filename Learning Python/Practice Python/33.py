@@ -1,6 +1,10 @@
 # Birthday Dictionaries
 
+from bisect import bisect_left, insort
 import re
+import sys
+
+PAGE_SIZE = 20
 
 class BirthdaysAPI:
   MONTHS = [
@@ -10,8 +14,22 @@ class BirthdaysAPI:
     "October",  "November", "December"
   ]
 
+  # Days before the start of each month in a leap year, so that February 29th gets a day of its own
+  DAY_OFFSETS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+
   def __init__(self):
     self.birthdays = {}
+    self.months = [set() for month in BirthdaysAPI.MONTHS]
+    self.days = []
+    self.names = []
+
+    # Rendered `name: birthday` lines in listing order, built on first use
+    self.lines = None
+    self.positions = None
+    self.listing = None
+
+  def __get_day_of_year(month, day):
+    return BirthdaysAPI.DAY_OFFSETS[month] + day - 1
 
   def __format_month(month):
     return BirthdaysAPI.MONTHS[month]
@@ -30,14 +48,61 @@ class BirthdaysAPI:
     
     else:
       return str(day) + "th"
-    
+
+  DAYS = list(map(__format_day, range(32)))
+
   def __format_birthday(birthday):
     month, day, year = birthday
 
-    return f"{BirthdaysAPI.__format_month(month)} {BirthdaysAPI.__format_day(day)}, {year}"
+    return f"{BirthdaysAPI.__format_month(month)} {BirthdaysAPI.DAYS[day]}, {year}"
+
+  def __format_line(name, birthday):
+    return f"{name}: {BirthdaysAPI.__format_birthday(birthday)}"
+
+  def __get_lines(self):
+    if self.lines == None:
+      self.lines = [BirthdaysAPI.__format_line(name, birthday) for name, birthday in self.birthdays.items()]
+      self.positions = {name: i for i, name in enumerate(self.birthdays)}
+
+    return self.lines
+
+  def __update_line(self, name):
+    if self.lines == None:
+      return
+
+    # A new name goes to the end and a changed one keeps its place, the same as in `self.birthdays`
+    line = BirthdaysAPI.__format_line(name, self.birthdays[name])
+    if name in self.positions:
+      self.lines[self.positions[name]] = line
+    else:
+      self.positions[name] = len(self.lines)
+      self.lines.append(line)
+
+  def __index(self, name, birthday):
+    month, day, year = birthday
+
+    self.months[month].add(name)
+    insort(self.days, (BirthdaysAPI.__get_day_of_year(month, day), name))
+
+  def __unindex(self, name, birthday):
+    month, day, year = birthday
+
+    self.months[month].discard(name)
+    key = (BirthdaysAPI.__get_day_of_year(month, day), name)
+    i = bisect_left(self.days, key)
+    if i < len(self.days) and self.days[i] == key:
+      del self.days[i]
 
   def add_birthday(self, name, month, day, year):
+    if name in self.birthdays:
+      self.__unindex(name, self.birthdays[name])
+    else:
+      insort(self.names, name)
+
     self.birthdays[name] = (month, day, year)
+    self.__index(name, self.birthdays[name])
+    self.__update_line(name)
+    self.listing = None
 
   def has_birthday(self, name):
     return name in self.birthdays
@@ -55,12 +120,53 @@ class BirthdaysAPI:
     if len(self.birthdays) == 0:
       return "None yet!"
 
-    result = ""
+    if self.listing == None:
+      self.listing = "\n".join(self.__get_lines()).strip()
+
+    return self.listing
+
+  def get_page_count(self, page_size=PAGE_SIZE):
+    return (len(self.birthdays) + page_size - 1) // page_size
+
+  def get_birthdays_page(self, page, page_size=PAGE_SIZE):
+    if len(self.birthdays) == 0:
+      return "None yet!"
+
+    return "\n".join(self.__get_lines()[page * page_size:(page + 1) * page_size])
 
-    for name, birthday in self.birthdays.items():
-      result += f"{name}: {BirthdaysAPI.__format_birthday(birthday)}\n"
+  def iter_birthdays_string(self, page_size=PAGE_SIZE):
+    for page in range(self.get_page_count(page_size)):
+      yield self.get_birthdays_page(page, page_size) + "\n"
 
-    return result.strip()
+  def get_month_count(self, month):
+    return len(self.months[month])
+
+  def get_month_counts(self):
+    return [len(names) for names in self.months]
+
+  def get_birthdays_in_month(self, month):
+    return {name: self.birthdays[name] for name in self.months[month]}
+
+  def get_upcoming_birthdays(self, month, day, count):
+    # Birthdays are kept ordered by day of the year, so the next ones follow the first birthday on or after the date, wrapping around into January
+    start = bisect_left(self.days, (BirthdaysAPI.__get_day_of_year(month, day), ""))
+
+    upcoming = []
+    for i in range(min(count, len(self.days))):
+      day_of_year, name = self.days[(start + i) % len(self.days)]
+      upcoming.append((name, self.birthdays[name]))
+
+    return upcoming
+
+  def find_names(self, prefix, limit=None):
+    names = []
+
+    for i in range(bisect_left(self.names, prefix), len(self.names)):
+      if not self.names[i].startswith(prefix) or len(names) == limit:
+        break
+      names.append(self.names[i])
+
+    return names
 
 class BirthdaysUI:
   MONTH_LENGTHS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
@@ -152,7 +258,9 @@ class BirthdaysUI:
   def run(self):
     while True:
       print("Birthdays in database:")
-      print(self.api.get_birthdays_string())
+      print(self.api.get_birthdays_page(0))
+      if (remaining:=len(self.api.get_birthdays()) - PAGE_SIZE) > 0:
+        print(f"... and {remaining} more, `list` shows them all")
       print()
 
       action = input("Add/get entry (or `exit` to exit): ").strip().lower()
@@ -163,6 +271,10 @@ class BirthdaysUI:
         self.api.add_birthday(name, month, day, year)
         print("Added!")
 
+      elif action == "list":
+        for page in self.api.iter_birthdays_string():
+          sys.stdout.write(page)
+
       elif action == "get":
         name = BirthdaysUI.__get_name_input()
 
@@ -1,7 +1,23 @@
 # Birthday Json
 
-import re
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor
 import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from birthday_store import get_log_filename, is_json_lines, iter_log, read_birthdays, write_birthdays
+
+EXTRA = 0
+
+SYNC_BATCH = 64
+SYNC_INTERVAL = 1.0
+COMPACT_MINIMUM = 10000
+PAGE_SIZE = 20
 
 class BirthdaysAPI:
   MONTHS = [
@@ -11,16 +27,122 @@ class BirthdaysAPI:
     "October",  "November", "December"
   ]
 
-  def __init__(self):
+  # Days before the start of each month in a leap year, so that February 29th gets a day of its own
+  DAY_OFFSETS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+
+  def __init__(self, filename="34.json", sync_batch=SYNC_BATCH, sync_interval=SYNC_INTERVAL):
     self.birthdays = {}
+    self.months = [set() for month in BirthdaysAPI.MONTHS]
+    self.days = []
+    self.names = []
+
+    # Rendered `name: birthday` lines in listing order, built on first use
+    self.lines = None
+    self.positions = None
+    self.listing = None
+
+    self.filename = filename
+    self.log_filename = get_log_filename(filename)
+    self.sync_batch = sync_batch
+    self.sync_interval = sync_interval
+
+    self.log = None
+    self.log_entries = 0
+    self.snapshot_entries = 0
+    self.unsynced = 0
+    self.synced_time = 0
+
+  def __replay_log(self):
+    try:
+      f = open(self.log_filename, 'r+b')
+    except FileNotFoundError:
+      return
+
+    with f:
+      end = 0
+      for name, birthday, end in iter_log(f):
+        self.birthdays[name] = birthday
+        self.log_entries += 1
+
+      # A half written entry left by a crash is cut off, so new entries start on a line of their own
+      f.truncate(end)
+
+  def __build_indexes(self):
+    self.months = [set() for month in BirthdaysAPI.MONTHS]
+    for name, (month, day, year) in self.birthdays.items():
+      self.months[month].add(name)
+
+    self.days = sorted((BirthdaysAPI.__get_day_of_year(month, day), name) for name, (month, day, year) in self.birthdays.items())
+    self.names = sorted(self.birthdays)
+
+  def __index(self, name, birthday):
+    month, day, year = birthday
+
+    self.months[month].add(name)
+    insort(self.days, (BirthdaysAPI.__get_day_of_year(month, day), name))
+
+  def __unindex(self, name, birthday):
+    month, day, year = birthday
+
+    self.months[month].discard(name)
+    key = (BirthdaysAPI.__get_day_of_year(month, day), name)
+    i = bisect_left(self.days, key)
+    if i < len(self.days) and self.days[i] == key:
+      del self.days[i]
 
   def load(self):
-    with open("34.json", 'r') as f:
-      self.birthdays = json.load(f)
+    self.close()
+
+    # The snapshot is read one entry at a time, so only the entries themselves are ever held in memory
+    try:
+      self.birthdays = dict(read_birthdays(self.filename))
+    except FileNotFoundError:
+      self.birthdays = {}
+    self.snapshot_entries = len(self.birthdays)
+
+    # Entries already in the snapshot may be replayed again, which leaves them unchanged
+    self.log_entries = 0
+    self.__replay_log()
+    self.__build_indexes()
+    self.lines = None
+    self.listing = None
+
+    self.log = open(self.log_filename, 'ab')
+    self.synced_time = time.monotonic()
+
+  def sync(self):
+    if self.log == None or self.unsynced == 0:
+      return
+
+    self.log.flush()
+    os.fsync(self.log.fileno())
+
+    self.unsynced = 0
+    self.synced_time = time.monotonic()
 
   def dump(self):
-    with open("34.json", 'w') as f:
-      json.dump(self.birthdays, f)
+    temporary = f"{self.filename}.{os.getpid()}.tmp"
+    write_birthdays(temporary, self.birthdays.items(), is_json_lines(self.filename))
+    os.replace(temporary, self.filename)
+    self.snapshot_entries = len(self.birthdays)
+
+    # The snapshot now holds everything in the log, so the log starts over
+    if self.log != None:
+      self.log.close()
+      self.log = open(self.log_filename, 'wb')
+      self.log_entries = 0
+      self.unsynced = 0
+
+  def close(self):
+    if self.log == None:
+      return
+
+    self.sync()
+    self.log.close()
+    self.log = None
+
+  def __get_day_of_year(month, day):
+    return BirthdaysAPI.DAY_OFFSETS[month] + day - 1
 
   def __format_month(month):
     return BirthdaysAPI.MONTHS[month]
@@ -39,14 +161,62 @@ class BirthdaysAPI:
     
     else:
       return str(day) + "th"
-    
+
+  DAYS = list(map(__format_day, range(32)))
+
   def __format_birthday(birthday):
     month, day, year = birthday
 
-    return f"{BirthdaysAPI.__format_month(month)} {BirthdaysAPI.__format_day(day)}, {year}"
+    return f"{BirthdaysAPI.__format_month(month)} {BirthdaysAPI.DAYS[day]}, {year}"
+
+  def __format_line(name, birthday):
+    return f"{name}: {BirthdaysAPI.__format_birthday(birthday)}"
+
+  def __get_lines(self):
+    if self.lines == None:
+      self.lines = [BirthdaysAPI.__format_line(name, birthday) for name, birthday in self.birthdays.items()]
+      self.positions = {name: i for i, name in enumerate(self.birthdays)}
+
+    return self.lines
+
+  def __update_line(self, name):
+    if self.lines == None:
+      return
+
+    # A new name goes to the end and a changed one keeps its place, the same as in `self.birthdays`
+    line = BirthdaysAPI.__format_line(name, self.birthdays[name])
+    if name in self.positions:
+      self.lines[self.positions[name]] = line
+    else:
+      self.positions[name] = len(self.lines)
+      self.lines.append(line)
 
   def add_birthday(self, name, month, day, year):
+    if name in self.birthdays:
+      self.__unindex(name, self.birthdays[name])
+    else:
+      insort(self.names, name)
+
     self.birthdays[name] = (month, day, year)
+    self.__index(name, self.birthdays[name])
+    self.__update_line(name)
+    self.listing = None
+
+    if self.log == None:
+      return
+
+    # Every entry reaches the OS straight away, while fsyncs are shared between entries added close together
+    self.log.write(json.dumps([name, month, day, year]).encode() + b'\n')
+    self.log.flush()
+    self.log_entries += 1
+    self.unsynced += 1
+
+    if self.unsynced >= self.sync_batch or time.monotonic() - self.synced_time >= self.sync_interval:
+      self.sync()
+
+    # Compacting once the log outgrows the snapshot keeps replay short at a constant amortized cost
+    if self.log_entries >= max(COMPACT_MINIMUM, self.snapshot_entries):
+      self.dump()
 
   def has_birthday(self, name):
     return name in self.birthdays
@@ -64,12 +234,89 @@ class BirthdaysAPI:
     if len(self.birthdays) == 0:
       return "None yet!"
 
-    result = ""
+    if self.listing == None:
+      self.listing = "\n".join(self.__get_lines()).strip()
+
+    return self.listing
+
+  def get_page_count(self, page_size=PAGE_SIZE):
+    return (len(self.birthdays) + page_size - 1) // page_size
+
+  def get_birthdays_page(self, page, page_size=PAGE_SIZE):
+    if len(self.birthdays) == 0:
+      return "None yet!"
+
+    return "\n".join(self.__get_lines()[page * page_size:(page + 1) * page_size])
+
+  def iter_birthdays_string(self, page_size=PAGE_SIZE):
+    for page in range(self.get_page_count(page_size)):
+      yield self.get_birthdays_page(page, page_size) + "\n"
+
+  def get_month_count(self, month):
+    return len(self.months[month])
+
+  def get_month_counts(self):
+    return [len(names) for names in self.months]
+
+  def get_birthdays_in_month(self, month):
+    return {name: self.birthdays[name] for name in self.months[month]}
+
+  def get_upcoming_birthdays(self, month, day, count):
+    # Birthdays are kept ordered by day of the year, so the next ones follow the first birthday on or after the date, wrapping around into January
+    start = bisect_left(self.days, (BirthdaysAPI.__get_day_of_year(month, day), ""))
+
+    upcoming = []
+    for i in range(min(count, len(self.days))):
+      day_of_year, name = self.days[(start + i) % len(self.days)]
+      upcoming.append((name, self.birthdays[name]))
 
-    for name, birthday in self.birthdays.items():
-      result += f"{name}: {BirthdaysAPI.__format_birthday(birthday)}\n"
+    return upcoming
 
-    return result.strip()
+  def find_names(self, prefix, limit=None):
+    names = []
+
+    for i in range(bisect_left(self.names, prefix), len(self.names)):
+      if not self.names[i].startswith(prefix) or len(names) == limit:
+        break
+      names.append(self.names[i])
+
+    return names
+
+def convert_birthdays(source, target):
+  write_birthdays(target, read_birthdays(source), is_json_lines(target))
+
+def filter_birthdays(filename, predicate):
+  for name, birthday in read_birthdays(filename):
+    if predicate(name, birthday):
+      yield name, birthday
+
+def count_birthday_months(filename):
+  counts = [0] * len(BirthdaysAPI.MONTHS)
+  for name, (month, day, year) in read_birthdays(filename):
+    counts[month] += 1
+
+  return counts
+
+def count_birthday_months_in_memory(filename):
+  with open(filename, 'r') as f:
+    birthdays = json.load(f)
+
+  counts = [0] * len(BirthdaysAPI.MONTHS)
+  for name, (month, day, year) in birthdays.items():
+    counts[month] += 1
+
+  return counts
+
+def get_peak_rss(function, *args):
+  # Only available on Unix, and only needed by the benchmark
+  import resource
+
+  function(*args)
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def write_fixture(filename, count):
+  birthdays = ((f"Person {i}", [random.randrange(12), random.randint(1, 28), random.randint(1900, 2020)]) for i in range(count))
+  write_birthdays(filename, birthdays)
 
 class BirthdaysUI:
   MONTH_LENGTHS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
@@ -163,7 +410,9 @@ class BirthdaysUI:
 
     while True:
       print("Birthdays in database:")
-      print(self.api.get_birthdays_string())
+      print(self.api.get_birthdays_page(0))
+      if (remaining:=len(self.api.get_birthdays()) - PAGE_SIZE) > 0:
+        print(f"... and {remaining} more, `list` shows them all")
       print()
 
       action = input("Add/get entry (or `exit` to exit): ").strip().lower()
@@ -174,6 +423,10 @@ class BirthdaysUI:
         self.api.add_birthday(name, month, day, year)
         print("Added!")
 
+      elif action == "list":
+        for page in self.api.iter_birthdays_string():
+          sys.stdout.write(page)
+
       elif action == "get":
         name = BirthdaysUI.__get_name_input()
 
@@ -187,9 +440,34 @@ class BirthdaysUI:
         break
       
       print()
-  
-    self.api.dump()
+
+    self.api.close()
 
 if __name__ == "__main__":
-  birthdays = BirthdaysUI()
-  birthdays.run()
\ No newline at end of file
+  if EXTRA == 0:
+    birthdays = BirthdaysUI()
+    birthdays.run()
+
+  elif EXTRA == 1:
+    with tempfile.TemporaryDirectory() as directory:
+      # Every measurement runs in a fresh process, so that its peak is its own
+      with ProcessPoolExecutor(1) as executor:
+        baseline = executor.submit(get_peak_rss, len, "").result()
+
+      for count in [100000, 1000000, 3000000]:
+        filename = os.path.join(directory, f"{count}.json")
+        write_fixture(filename, count)
+        convert_birthdays(filename, filename + 'l')
+
+        print(f"{count} birthdays, {os.path.getsize(filename) / 1e6:.1f} MB:")
+        for label, function, source in [
+          ("json.load", count_birthday_months_in_memory, filename),
+          ("streamed object", count_birthday_months, filename),
+          ("streamed lines", count_birthday_months, filename + 'l')
+        ]:
+          with ProcessPoolExecutor(1) as executor:
+            start = time.perf_counter()
+            peak = executor.submit(get_peak_rss, function, source).result()
+            elapsed = time.perf_counter() - start
+
+          print(f"  {label}: {elapsed:.2f}s, {(peak - baseline) / 1e6:.1f} MB peak RSS over baseline")
\ No newline at end of file
@@ -1,8 +1,11 @@
 # Birthday Months
 
-import json
 from collections import Counter
 
+import numpy as np
+
+from birthday_store import load_birthdays
+
 MONTHS = [
   "January",  "February", "March",
   "April",    "May",      "June",
@@ -11,24 +14,20 @@ MONTHS = [
 ]
 
 if __name__ == "__main__":
-  with open("34.json", 'r') as f:
-    birthdays = json.load(f)
+  birthdays = load_birthdays("34.json")
 
-    # counts = {}
-    # for name, birthday in birthdays.items():
-    #   month, day, year = birthday
+  # counts = {}
+  # for name, birthday in birthdays.items():
+  #   month, day, year = birthday
 
-    #   month = MONTHS[month]
-    #   if month not in counts:
-    #     counts[month] = 0
-    #   counts[month] += 1
+  #   month = MONTHS[month]
+  #   if month not in counts:
+  #     counts[month] = 0
+  #   counts[month] += 1
 
-    # print(counts)
-      
-    months = []
-    for name, birthday in birthdays.items():
-      month, day, year = birthday
+  # print(counts)
 
-      months.append(MONTHS[month])
+  months = np.fromiter((birthday[0] for birthday in birthdays.values()), dtype=np.int64, count=len(birthdays))
+  counts = np.bincount(months, minlength=len(MONTHS))
 
-    print(Counter(months))
\ No newline at end of file
+  print(Counter({MONTHS[month]: int(count) for month, count in enumerate(counts) if count != 0}))
\ No newline at end of file
@@ -1,11 +1,154 @@
 # Birthday Plots
 
-import matplotlib.pyplot as plt
+import datetime
+import itertools
 import json
+import os
+import random
+import tempfile
+import time
+
+from matplotlib.figure import Figure
+import matplotlib.pyplot as plt
+import numpy as np
+
+from birthday_store import load_birthdays
+
+EXTRA = 0
+
+MONTHS = [
+  "January",  "February", "March",
+  "April",    "May",      "June",
+  "July",     "August",   "September",
+  "October",  "November", "December"
+]
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+DATE_LENGTH = len("MM/DD/YYYY")
+
+def parse_dates(dates):
+  # All dates are joined into one buffer and read as a byte matrix, one row per date and one column per character,
+  # where a date of the wrong length shifts a newline out of the last column
+  if len(dates) == 0:
+    return tuple(np.zeros(0, dtype=np.int64) for i in range(3))
+
+  data = ("\n".join(dates) + "\n").encode("ascii", "replace")
+  if len(data) % (DATE_LENGTH + 1) != 0:
+    raise ValueError("dates must be formatted as MM/DD/YYYY")
+
+  characters = np.frombuffer(data, dtype=np.uint8).reshape(-1, DATE_LENGTH + 1)
+  digits = characters[:, [0, 1, 3, 4, 6, 7, 8, 9]].astype(np.int64) - ord('0')
+
+  if (characters[:, [2, 5]] != ord('/')).any() or (characters[:, DATE_LENGTH] != ord('\n')).any() or ((digits < 0) | (digits > 9)).any():
+    raise ValueError("dates must be formatted as MM/DD/YYYY")
+
+  months = digits[:, 0] * 10 + digits[:, 1] - 1
+  days = digits[:, 2] * 10 + digits[:, 3]
+  years = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+
+  return months, days, years
+
+def load_columns(filename):
+  values = list(load_birthdays(filename).values())
+
+  # `34.json` stores `[month, day, year]` with a 0-based month, `36.json` stores "MM/DD/YYYY"
+  if len(values) != 0 and isinstance(values[0], str):
+    return parse_dates(values)
+
+  columns = np.fromiter(itertools.chain.from_iterable(values), dtype=np.int64, count=3 * len(values)).reshape(-1, 3)
+  return columns[:, 0], columns[:, 1], columns[:, 2]
+
+def get_weekdays(months, days, years):
+  dates = (years - 1970).astype("datetime64[Y]") + months.astype("timedelta64[M]")
+  dates = dates.astype("datetime64[D]") + (days - 1).astype("timedelta64[D]")
+
+  # 1970-01-01 was a Thursday, and weekdays count from Monday
+  return (dates.astype(np.int64) + 3) % 7
+
+def count_months(months):
+  return np.bincount(months, minlength=len(MONTHS))
+
+def count_weekdays(months, days, years):
+  return np.bincount(get_weekdays(months, days, years), minlength=len(WEEKDAYS))
+
+def count_decades(years):
+  if len(years) == 0:
+    return [], np.zeros(0, dtype=np.int64)
+
+  decades = years // 10
+  first = decades.min()
+  counts = np.bincount(decades - first)
+
+  return [f"{(first + i) * 10}s" for i in range(len(counts))], counts
+
+def plot_histogram(labels, counts, title, filename):
+  # A bare `Figure` draws without a display or a pyplot backend
+  figure = Figure(figsize=(max(6, len(labels) * 0.6), 4))
+  axes = figure.subplots()
+
+  axes.bar(range(len(counts)), counts)
+  axes.set_xticks(range(len(labels)), labels, rotation=45, ha="right")
+  axes.set_title(title)
+
+  figure.tight_layout()
+  figure.savefig(filename)
+
+def plot_histograms(filename, directory="."):
+  months, days, years = load_columns(filename)
+  name = os.path.splitext(os.path.basename(filename))[0]
+
+  decades, decade_counts = count_decades(years)
+  histograms = [
+    ("month", MONTHS, count_months(months)),
+    ("weekday", WEEKDAYS, count_weekdays(months, days, years)),
+    ("decade", decades, decade_counts)
+  ]
+
+  filenames = []
+  for key, labels, counts in histograms:
+    filenames.append(os.path.join(directory, f"{name}_{key}.png"))
+    plot_histogram(labels, counts, f"Birthdays by {key}", filenames[-1])
+
+  return filenames
+
+def write_fixture(filename, count):
+  with open(filename, 'w') as f:
+    f.write('{')
+    for i in range(count):
+      f.write(f"{', ' if i != 0 else ''}\"Person {i}\": \"{random.randint(1, 12):02}/{random.randint(1, 28):02}/{random.randint(1700, 2020)}\"")
+    f.write('}')
 
 if __name__ == "__main__":
-  with open("36.json", 'r') as f:
-    birthdays = json.load(f)
+  if EXTRA == 0:
+    with open("36.json", 'r') as f:
+      birthdays = json.load(f)
+
+      plt.hist(birthdays.values())
+      plt.show();
+
+  elif EXTRA == 1:
+    for filename in ["34.json", "36.json"]:
+      for output in plot_histograms(filename):
+        print(output)
+
+  elif EXTRA == 2:
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, "birthdays.json")
+      write_fixture(filename, 2000000)
+
+      with open(filename, 'r') as f:
+        values = list(json.load(f).values())
+
+      start = time.perf_counter()
+      counts = [0] * len(WEEKDAYS)
+      for value in values:
+        month, day, year = map(int, value.split('/'))
+        counts[datetime.date(year, month, day).weekday()] += 1
+      loop_time = time.perf_counter() - start
+
+      start = time.perf_counter()
+      columnar = count_weekdays(*parse_dates(values))
+      columnar_time = time.perf_counter() - start
 
-    plt.hist(birthdays.values())
-    plt.show();
\ No newline at end of file
+      print(f"{len(values)} records: loop {loop_time:.2f}s, columnar {columnar_time:.2f}s ({counts == columnar.tolist()})")
\ No newline at end of file
@@ -1,21 +1,65 @@
 # Divisors
 
+from array import array
+import math
+import mmap
+import os
+import struct
+
 SIEVE_SIZE = 100000
 
-sieve = [0] * SIEVE_SIZE
-for i in range(2, SIEVE_SIZE):
-  if sieve[i] == 0:
-    sieve[i] = i
-    for j in range(i * i, SIEVE_SIZE, i):
-      if sieve[j] == 0:
-        sieve[j] = i
+# Same versioned layout as `LinearSieve.dump` in 11.py, so the two can share cache files
+SIEVE_FILENAME = f"sieve_{SIEVE_SIZE}.bin"
+SIEVE_HEADER = struct.Struct("<4sBc2xQ").pack(b"SIEV", 1, b'H', SIEVE_SIZE)
+
+sieve = None
+def get_sieve():
+  global sieve
+
+  if sieve != None:
+    return sieve
+
+  try:
+    with open(SIEVE_FILENAME, 'rb') as f:
+      data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if data[:len(SIEVE_HEADER)] == SIEVE_HEADER and len(data) == len(SIEVE_HEADER) + 2 * SIEVE_SIZE:
+      sieve = memoryview(data)[len(SIEVE_HEADER):].cast('H')
+      return sieve
+
+    data.close()
+  except (OSError, ValueError):
+    pass
+
+  # Primes are left as 0, so only factors up to sqrt(SIEVE_SIZE) are stored
+  sieve = array('H', [0]) * SIEVE_SIZE
+  for i in range(math.isqrt(SIEVE_SIZE - 1), 1, -1):
+    sieve[i * i::i] = array('H', [i]) * len(range(i * i, SIEVE_SIZE, i))
+
+  # The cache only saves time, so a directory that cannot be written to just means rebuilding the table next run
+  temporary = f"{SIEVE_FILENAME}.{os.getpid()}.tmp"
+  try:
+    with open(temporary, 'wb') as f:
+      f.write(SIEVE_HEADER)
+      f.write(sieve)
+    os.replace(temporary, SIEVE_FILENAME)
+
+  except OSError:
+    pass
+
+  finally:
+    if os.path.exists(temporary):
+      os.remove(temporary)
+
+  return sieve
 
 if __name__ == "__main__":
   dividend = int(input(f"Dividend, in range [1, {SIEVE_SIZE}): "))
 
+  sieve = get_sieve()
   divisors = []
   while dividend != 1:
-    divisor = sieve[dividend]
+    divisor = sieve[dividend] or dividend
     dividend //= divisor
     divisors.append(divisor)
     
@@ -28,16 +28,19 @@ if __name__ == "__main__":
     a = [random.randint(1, 100) for i in range(random.randint(10, 20))]
     b = [random.randint(1, 100) for i in range(random.randint(10, 20))]
 
+    b_set = set(b)
+
     c = []
     for key in a:
-      if key in b:
+      if key in b_set:
         c.append(key)
   
   elif EXTRA == 2:
     a = [random.randint(1, 100) for i in range(random.randint(10, 20))]
     b = [random.randint(1, 100) for i in range(random.randint(10, 20))]
 
-    c = list(filter(lambda x: x in b, a))
+    b_set = set(b)
+    c = list(filter(lambda x: x in b_set, a))
     
   print("a: " + str(a))
   print("b: " + str(b))
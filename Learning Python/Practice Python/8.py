@@ -1,52 +1,230 @@
 # Rock Paper Scissors
 
+from concurrent.futures import ProcessPoolExecutor
+import itertools
 import random
+import time
+
+EXTRA = 0
+
+ROCK = 0
+PAPER = 1
+SCISSORS = 2
+
+CODES = {'r': ROCK, 'p': PAPER, 's': SCISSORS}
+NAMES = ["Rock", "Paper", "Scissors"]
+
+LOSE = -1
+DRAW = 0
+WIN = 1
+
+# `OUTCOMES[a][b]` is the result of playing `a` against `b`
+OUTCOMES = [
+  [DRAW, LOSE, WIN],
+  [WIN, DRAW, LOSE],
+  [LOSE, WIN, DRAW]
+]
+
+# `BEATS[a]` is the move that beats `a`
+BEATS = [PAPER, SCISSORS, ROCK]
 
 def to_string(char):
-  if char == 'r':
-    return "Rock"
-  
-  if char == 'p':
-    return "Paper"
-  
-  if char == 's':
-    return "Scissors"
-  
-  return "Invalid option"
+  if char not in CODES:
+    return "Invalid option"
+
+  return NAMES[CODES[char]]
 
 def win(a, b):
-  return (a == 'r' and b == 's') or (a == 'p' and b == 'r') or (a == 's' and b == 'p')
+  return OUTCOMES[CODES[a]][CODES[b]] == WIN
 
 def draw(a, b):
   return a == b
 
 def lose(a, b):
-  return not win(a, b) and not draw(a, b)
+  return OUTCOMES[CODES[a]][CODES[b]] == LOSE
+
+class Strategy:
+  def __init__(self, seed=None):
+    self.random = random.Random(seed)
+
+  def move(self):
+    return self.random.randrange(3)
+
+  def update(self, own, opponent):
+    pass
+
+class RandomStrategy(Strategy):
+  pass
+
+class ConstantStrategy(Strategy):
+  def __init__(self, seed=None, move=ROCK):
+    super().__init__(seed)
+    self.constant = move
+
+  def move(self):
+    return self.constant
+
+class CycleStrategy(Strategy):
+  def __init__(self, seed=None):
+    super().__init__(seed)
+    self.next = self.random.randrange(3)
+
+  def move(self):
+    return self.next
+
+  def update(self, own, opponent):
+    self.next = (own + 1) % 3
+
+class BeatLastStrategy(Strategy):
+  def __init__(self, seed=None):
+    super().__init__(seed)
+    self.last = None
+
+  def move(self):
+    if self.last == None:
+      return self.random.randrange(3)
+
+    return BEATS[self.last]
+
+  def update(self, own, opponent):
+    self.last = opponent
+
+class FrequencyStrategy(Strategy):
+  def __init__(self, seed=None):
+    super().__init__(seed)
+    self.counts = [0, 0, 0]
+
+  def move(self):
+    counts = self.counts
+    if counts[0] == counts[1] == counts[2]:
+      return self.random.randrange(3)
+
+    return BEATS[counts.index(max(counts))]
+
+  def update(self, own, opponent):
+    self.counts[opponent] += 1
+
+class MarkovStrategy(Strategy):
+  def __init__(self, seed=None, order=1):
+    super().__init__(seed)
+    self.states = 3 ** order
+    self.state = 0
+    self.seen = 0
+    self.order = order
+
+    # Counts of the opponent's next move after every history of `order` moves, history `h` at `counts[h * 3:h * 3 + 3]`
+    self.counts = [0] * (self.states * 3)
+
+  def move(self):
+    if self.seen < self.order:
+      return self.random.randrange(3)
+
+    i = self.state * 3
+    counts = self.counts[i:i + 3]
+    if counts[0] == counts[1] == counts[2]:
+      return self.random.randrange(3)
+
+    return BEATS[counts.index(max(counts))]
+
+  def update(self, own, opponent):
+    if self.seen >= self.order:
+      self.counts[self.state * 3 + opponent] += 1
+    else:
+      self.seen += 1
+
+    self.state = (self.state * 3 + opponent) % self.states
+
+STRATEGIES = {
+  "random": (RandomStrategy, {}),
+  "rock": (ConstantStrategy, {"move": ROCK}),
+  "cycle": (CycleStrategy, {}),
+  "beat last": (BeatLastStrategy, {}),
+  "frequency": (FrequencyStrategy, {}),
+  "markov 1": (MarkovStrategy, {"order": 1}),
+  "markov 2": (MarkovStrategy, {"order": 2}),
+  "markov 3": (MarkovStrategy, {"order": 3})
+}
+
+def create_strategy(name, seed=None):
+  strategy, options = STRATEGIES[name]
+
+  return strategy(seed, **options)
+
+def play_match(a, b, rounds, seed=None):
+  seeds = random.Random(seed)
+  first = create_strategy(a, seeds.getrandbits(64))
+  second = create_strategy(b, seeds.getrandbits(64))
+
+  results = [0, 0, 0]
+  for i in range(rounds):
+    x, y = first.move(), second.move()
+    results[OUTCOMES[x][y] + 1] += 1
+
+    first.update(x, y)
+    second.update(y, x)
+
+  losses, draws, wins = results
+  return a, b, wins, draws, losses
+
+def tournament(names, rounds, workers=None, seed=None):
+  seeds = random.Random(seed)
+  pairs = list(itertools.combinations(names, 2))
+
+  # Every pairing is one task, since a learning strategy has to see the whole match
+  stats = {name: [0, 0, 0] for name in names}
+  matches = {}
+  with ProcessPoolExecutor(workers) as executor:
+    futures = [executor.submit(play_match, a, b, rounds, seeds.getrandbits(64)) for a, b in pairs]
+
+    for future in futures:
+      a, b, wins, draws, losses = future.result()
+      matches[(a, b)] = (wins, draws, losses)
+
+      for name, result in [(a, (wins, draws, losses)), (b, (losses, draws, wins))]:
+        for i in range(3):
+          stats[name][i] += result[i]
+
+  return stats, matches
+
+def get_win_rate(wins, draws, losses):
+  return wins / (wins + draws + losses)
 
 if __name__ == "__main__":
-  player_score, opponent_score = 0, 0
+  if EXTRA == 0:
+    player_score, opponent_score = 0, 0
+
+    while True:
+      player = input("Rock:\t\tR/r\nPaper:\t\tP/p\nScissors:\tS/s\nQuit:\t\tQ/q\n").strip().lower()
+
+      if player in CODES:
+        opponent = "rps"[random.randint(0, 2)]
+        print(f"Your opponent chooses `{to_string(opponent)}`!")
+
+        if win(player, opponent):
+          print(f"`{to_string(player)}` beats `{to_string(opponent)}`, you win!")
+          player_score += 1
+
+        elif draw(player, opponent):
+          print(f"`{to_string(player)}` draws `{to_string(opponent)}`, you draw.")
+
+        elif lose(player, opponent):
+          print(f"`{to_string(opponent)}` beats `{to_string(player)}`, you lose.")
+          opponent_score += 1
 
-  while True:
-    player = input("Rock:\t\tR/r\nPaper:\t\tP/p\nScissors:\tS/s\nQuit:\t\tQ/q\n").strip().lower()
+        print(f"The current score is {player_score} to {opponent_score}.")
 
-    if player in "rps":
-      opponent = "rps"[random.randint(0, 2)]
-      print(f"Your opponent chooses `{to_string(opponent)}`!")
+      elif player == 'q':
+        break
 
-      if win(player, opponent):
-        print(f"`{to_string(player)}` beats `{to_string(opponent)}`, you win!")
-        player_score += 1
+      print()
 
-      elif draw(player, opponent):
-        print(f"`{to_string(player)}` draws `{to_string(opponent)}`, you draw.")
+  elif EXTRA == 1:
+    rounds = 1000000
 
-      elif lose(player, opponent):
-        print(f"`{to_string(opponent)}` beats `{to_string(player)}`, you lose.")
-        opponent_score += 1
-      
-      print(f"The current score is {player_score} to {opponent_score}.")
+    start = time.perf_counter()
+    stats, matches = tournament(list(STRATEGIES), rounds)
+    elapsed = time.perf_counter() - start
 
-    elif player == 'q':
-      break
-      
-    print()
\ No newline at end of file
+    print(f"{len(matches)} matches of {rounds} rounds in {elapsed:.2f}s")
+    for name, result in sorted(stats.items(), key=lambda x: -get_win_rate(*x[1])):
+      print(f"{name}: {get_win_rate(*result):.3f} win rate ({result[0]} wins, {result[1]} draws, {result[2]} losses)")
\ No newline at end of file
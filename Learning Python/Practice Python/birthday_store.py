@@ -0,0 +1,137 @@
+# Birthday Store
+
+import json
+import os
+import re
+
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Birthdays come in two layouts: one JSON object of `"name": [month, day, year]`, as in `34.json`,
+# or JSON lines of `["name", month, day, year]`, which is also how the log stores them
+def iter_json_records(f, chunk_size=CHUNK_SIZE):
+  decoder = json.JSONDecoder()
+
+  buffer, position, eof = "", 0, False
+  expected, name = '{', None
+
+  while True:
+    position = WHITESPACE.match(buffer, position).end()
+
+    end = None
+    if position < len(buffer):
+      if expected == "first key" and buffer[position] == '}':
+        token, end = '}', position + 1
+        expected = ','
+
+      elif expected in ["first key", "key", "value"]:
+        try:
+          token, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+          pass
+
+      else:
+        token, end = buffer[position], position + 1
+
+    # A token that reaches the end of the buffer may have been cut off, so it is only taken once more has been read
+    if end == None or (end == len(buffer) and not eof):
+      if eof:
+        raise ValueError("birthdays must be a JSON object")
+
+      chunk = f.read(chunk_size)
+      eof = chunk == ""
+      buffer, position = buffer[position:] + chunk, 0
+      continue
+
+    position = end
+
+    if expected == "first key" or expected == "key":
+      if not isinstance(token, str):
+        raise ValueError("birthdays must be a JSON object")
+      name, expected = token, ':'
+
+    elif expected == "value":
+      yield name, token
+      expected = ','
+
+    elif token != expected and not (expected == ',' and token == '}'):
+      raise ValueError("birthdays must be a JSON object")
+
+    elif token == '}':
+      return
+
+    elif token == '{':
+      expected = "first key"
+
+    elif token == ':':
+      expected = "value"
+
+    else:
+      expected = "key"
+
+def iter_json_lines(f):
+  for line in f:
+    if line.strip() != "":
+      name, month, day, year = json.loads(line)
+      yield name, [month, day, year]
+
+def is_json_lines(filename):
+  return filename.endswith(".jsonl")
+
+def read_birthdays(filename):
+  with open(filename, 'r') as f:
+    if is_json_lines(filename):
+      yield from iter_json_lines(f)
+    else:
+      yield from iter_json_records(f)
+
+def get_log_filename(filename):
+  return os.path.splitext(filename)[0] + ".log"
+
+def iter_log(f):
+  end = 0
+  for line in f:
+    # A crash can leave the last entry half written, and everything from there on is ignored
+    if not line.endswith(b'\n'):
+      return
+
+    try:
+      name, month, day, year = json.loads(line)
+    except ValueError:
+      return
+
+    end += len(line)
+    yield name, [month, day, year], end
+
+def load_birthdays(filename):
+  # `BirthdaysAPI` only folds its log into the snapshot now and then, so readers replay it on top themselves
+  try:
+    birthdays = dict(read_birthdays(filename))
+  except FileNotFoundError:
+    birthdays = {}
+
+  try:
+    with open(get_log_filename(filename), 'rb') as f:
+      for name, birthday, end in iter_log(f):
+        birthdays[name] = birthday
+  except FileNotFoundError:
+    pass
+
+  return birthdays
+
+def write_birthdays(filename, birthdays, lines=False):
+  with open(filename, 'w') as f:
+    if lines:
+      for name, (month, day, year) in birthdays:
+        f.write(json.dumps([name, month, day, year]) + "\n")
+
+    else:
+      # Same separators as `json.dump`, written one entry at a time
+      f.write('{')
+      for i, (name, birthday) in enumerate(birthdays):
+        f.write(f"{', ' if i != 0 else ''}{json.dumps(name)}: {json.dumps(list(birthday))}")
+      f.write('}')
+
+    f.flush()
+    os.fsync(f.fileno())
\ No newline at end of file
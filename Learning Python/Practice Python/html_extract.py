@@ -0,0 +1,156 @@
+# Selective HTML Extraction
+
+from html.parser import HTMLParser
+
+VOID_TAGS = {
+  "area", "base", "br", "col", "embed", "hr", "img", "input",
+  "link", "meta", "param", "source", "track", "wbr"
+}
+
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea"}
+
+class SelectiveExtractor(HTMLParser):
+  PENDING = object()
+
+  def __init__(self, tag, attributes={}):
+    super().__init__()
+    self.tag = tag
+    self.attributes = attributes
+
+    # Matches in document order, where `PENDING` marks one that is still open
+    self.results = []
+    self.emitted = 0
+
+    # Every open element as [tag, children, slot]: children are (is_tag, string) pairs, kept only inside a match,
+    # and slot is the absolute position of the element in the results if it matches
+    self.stack = []
+
+    # Whether the last event was text, which the parser can hand over in pieces across chunk boundaries
+    self.in_text = False
+
+  def __matches(self, tag, attributes):
+    if tag != self.tag:
+      return False
+
+    attributes = dict(attributes)
+    for key, value in self.attributes.items():
+      if key == "class":
+        if value not in (attributes.get(key) or "").split():
+          return False
+
+      elif attributes.get(key) != value:
+        return False
+
+    return True
+
+  def __get_string(children):
+    # Same rule as BeautifulSoup's `.string`: only a lone child has one
+    if children == None or len(children) != 1:
+      return None
+
+    return children[0][1]
+
+  def __is_collecting(self):
+    return len(self.stack) != 0 and self.stack[-1][1] != None
+
+  def __reserve(self):
+    self.results.append(SelectiveExtractor.PENDING)
+    return self.emitted + len(self.results) - 1
+
+  def __pop(self):
+    tag, children, slot = self.stack.pop()
+    string = SelectiveExtractor.__get_string(children)
+
+    # BeautifulSoup shrinks text that is only whitespace down to one character, outside of `<pre>` and `<textarea>`
+    if string != None and children[0][0] == False and string.strip(" \t\n\r\f") == "":
+      if tag not in PRESERVE_WHITESPACE_TAGS and not any(frame[0] in PRESERVE_WHITESPACE_TAGS for frame in self.stack):
+        string = '\n' if '\n' in string else ' '
+
+    if slot != None:
+      self.results[slot - self.emitted] = string
+
+    if self.__is_collecting():
+      self.stack[-1][1].append((True, string))
+
+  def handle_starttag(self, tag, attributes):
+    self.in_text = False
+
+    if tag in VOID_TAGS:
+      self.handle_startendtag(tag, attributes)
+      return
+
+    matched = self.__matches(tag, attributes)
+    children = [] if matched or self.__is_collecting() else None
+    slot = self.__reserve() if matched else None
+
+    self.stack.append([tag, children, slot])
+
+  def handle_startendtag(self, tag, attributes):
+    self.in_text = False
+
+    if self.__matches(tag, attributes):
+      self.results.append(None)
+
+    if self.__is_collecting():
+      self.stack[-1][1].append((True, None))
+
+  def handle_endtag(self, tag):
+    self.in_text = False
+
+    # Like BeautifulSoup, an end tag closes everything up to its own start tag, and one without a start tag is dropped
+    for i in range(len(self.stack) - 1, -1, -1):
+      if self.stack[i][0] == tag:
+        break
+    else:
+      return
+
+    while len(self.stack) > i:
+      self.__pop()
+
+  def handle_data(self, data):
+    if not self.__is_collecting():
+      self.in_text = False
+      return
+
+    children = self.stack[-1][1]
+    if self.in_text:
+      children[-1] = (False, children[-1][1] + data)
+    else:
+      children.append((False, data))
+
+    self.in_text = True
+
+  def handle_comment(self, data):
+    self.in_text = False
+
+    # A comment is a child of its own, whose string is its text
+    if self.__is_collecting():
+      self.stack[-1][1].append((False, data))
+
+  def close(self):
+    super().close()
+
+    # Elements still open at the end are closed, as BeautifulSoup does
+    while len(self.stack) != 0:
+      self.__pop()
+
+  def pop_results(self):
+    ready = 0
+    while ready < len(self.results) and self.results[ready] is not SelectiveExtractor.PENDING:
+      ready += 1
+
+    results = self.results[:ready]
+    del self.results[:ready]
+    self.emitted += ready
+
+    return results
+
+def extract_stream(chunks, tag, attributes={}):
+  extractor = SelectiveExtractor(tag, attributes)
+
+  for chunk in chunks:
+    extractor.feed(chunk)
+    yield from extractor.pop_results()
+
+  extractor.close()
+  yield from extractor.pop_results()
\ No newline at end of file
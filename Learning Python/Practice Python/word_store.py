@@ -0,0 +1,147 @@
+# Word Store
+
+from array import array
+import mmap
+import os
+import random
+import struct
+
+WORDS_FILENAME = "30.txt"
+REJECTION_ATTEMPTS = 64
+
+INDEX_MAGIC = b"WIDX"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sB3xIIQQ")
+
+class WordStore:
+  def __init__(self, filename=WORDS_FILENAME):
+    self.filename = filename
+    self.index_filename = filename + ".idx"
+
+    if not self.__load_index():
+      self.__build_index()
+      self.__load_index()
+
+  def __get_mask(word):
+    mask = 0
+    for letter in set(word.lower()):
+      mask |= 1 << (letter - ord('a')) if ord('a') <= letter <= ord('z') else 1 << 31
+
+    return mask
+
+  def __get_source_stat(self):
+    stat = os.stat(self.filename)
+    return stat.st_size, stat.st_mtime_ns
+
+  def __build_index(self):
+    buckets = {}
+
+    with open(self.filename, 'rb') as f:
+      offset = 0
+      for line in f:
+        if word:=line.strip():
+          buckets.setdefault(len(word), []).append((offset, WordStore.__get_mask(word)))
+        offset += len(line)
+
+    # Words are grouped by length, so `starts[n]:starts[n + 1]` are the words of length n
+    max_length = max(buckets, default=0)
+    starts, offsets, masks = array('I', [0]), array('I'), array('I')
+    for length in range(max_length + 1):
+      for offset, mask in buckets.get(length, []):
+        offsets.append(offset)
+        masks.append(mask)
+      starts.append(len(offsets))
+
+    temporary = f"{self.index_filename}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+      f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(offsets), max_length, *self.__get_source_stat()))
+      f.write(starts)
+      f.write(offsets)
+      f.write(masks)
+    os.replace(temporary, self.index_filename)
+
+  def __read_header(self, index):
+    if len(index) < INDEX_HEADER.size:
+      return None
+
+    magic, version, count, max_length, size, mtime = INDEX_HEADER.unpack_from(index)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION or (size, mtime) != self.__get_source_stat():
+      return None
+
+    if len(index) != INDEX_HEADER.size + 4 * (max_length + 2 + 2 * count):
+      return None
+
+    return count, max_length
+
+  def __load_index(self):
+    index, data = None, None
+    loaded = False
+
+    try:
+      with open(self.index_filename, 'rb') as f:
+        index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      with open(self.filename, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+      if (header:=self.__read_header(index)) == None:
+        return False
+
+      loaded = True
+
+    except (OSError, ValueError):
+      return False
+
+    # A stale or broken index is rebuilt, so neither mapping may outlive a failed load
+    finally:
+      if not loaded:
+        for mapping in [index, data]:
+          if mapping != None:
+            mapping.close()
+
+    count, max_length = header
+    table = memoryview(index)[INDEX_HEADER.size:].cast('I')
+    self.data = data
+    self.count = count
+    self.max_length = max_length
+    self.starts = table[:max_length + 2]
+    self.offsets = table[max_length + 2:max_length + 2 + count]
+    self.masks = table[max_length + 2 + count:]
+
+    return True
+
+  def __len__(self):
+    return self.count
+
+  def get_word(self, i):
+    offset = self.offsets[i]
+    end = self.data.find(b'\n', offset)
+
+    return self.data[offset:end if end != -1 else len(self.data)].decode().strip()
+
+  def random_word(self, length=None, letters=None):
+    if length == None:
+      lo, hi = 0, self.count
+    elif 0 <= length <= self.max_length:
+      lo, hi = self.starts[length], self.starts[length + 1]
+    else:
+      return None
+
+    if lo == hi:
+      return None
+
+    if letters == None:
+      return self.get_word(random.randrange(lo, hi))
+
+    excluded = ~WordStore.__get_mask(letters.encode())
+
+    # Sample first, and only scan the whole bucket when matches turn out to be rare
+    for attempt in range(REJECTION_ATTEMPTS):
+      i = random.randrange(lo, hi)
+      if self.masks[i] & excluded == 0:
+        return self.get_word(i)
+
+    candidates = [i for i in range(lo, hi) if self.masks[i] & excluded == 0]
+    if len(candidates) == 0:
+      return None
+
+    return self.get_word(random.choice(candidates))
\ No newline at end of file